@@ -1,2 +1,4 @@
-powershell.exe -NoProfile -ExecutionPolicy Bypass -File "Prepare_Input_Files.ps1"
-python load2table_TruncateTables.py
\ No newline at end of file
+REM Stream the settlement CSVs out of the uploaded zip/tar archives and load them
+python "ingest_archives.py"
+if %errorlevel% neq 0 exit /b %errorlevel%
+REM Loads are incremental (see load_ledger.py), run load2table_TruncateTables.py only for a full reset
\ No newline at end of file
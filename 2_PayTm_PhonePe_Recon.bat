@@ -10,8 +10,11 @@
 REM Change to the directory where this batch file is located
 cd /d "%~dp0"
 
-REM Now you can use just the filenames instead of full paths:
-start /min powershell.exe -NoProfile -ExecutionPolicy Bypass -File "Process_PayTm.ps1"
-start /min powershell.exe -NoProfile -ExecutionPolicy Bypass -File "Process_PhonePe.ps1" 
-start /min powershell.exe -NoProfile -ExecutionPolicy Bypass -File "Process_iCloud_Payment.ps1"
-start /min powershell.exe -NoProfile -ExecutionPolicy Bypass -File "Process_iCloud_Refund.ps1"
\ No newline at end of file
+REM Make sure every table has its Txn_Date column and the monthly partitions for the coming months
+python "schema_manager.py" extend
+if %errorlevel% neq 0 exit /b %errorlevel%
+
+REM Load PayTM, PhonePe, iCloud Payment and iCloud Refund files in parallel.
+REM run_pipeline.py only returns once every file is loaded, so step 3 never starts early.
+python "run_pipeline.py"
+if %errorlevel% neq 0 exit /b %errorlevel%
\ No newline at end of file
@@ -41,10 +41,23 @@
 
 
 import mysql.connector
-import pandas as pd
+import json
 import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dt_time
 from pathlib import Path
 from dotenv import load_dotenv
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from db_pool import ConnectionPool
+from pipeline_queue import put_until_stopped
+from recon_queries import (QUERIES, RECON_SHEET_FILTERS, REPORT_DAYS_QUERY, build_fingerprint_query,
+                           build_recon_outcome_query, build_sheet_query, recon_sheet_name)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -59,67 +72,371 @@ def get_db_config():
         'port': int(os.getenv('DB_PORT', 3306))
     }
 
-def main():
-    # Queries to extract data
-    queries = {
-        'SUMMARY': '''(SELECT txn_source, Txn_type, sum(Txn_Amount) FROM reconciliation.payment_refund pr GROUP BY 1, 2) 
-                     UNION 
-                     (SELECT Txn_Source, Txn_type, sum(Txn_Amount) FROM reconciliation.paytm_phonepe pp GROUP BY 1, 2)''',
-        
-        'RAWDATA': '''(SELECT * FROM reconciliation.paytm_phonepe pp) 
-                     UNION ALL 
-                     (SELECT * FROM reconciliation.payment_refund pr)''',
-        
-        'RECON_SUCCESS': '''SELECT *, 
-                           IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                              "Perfect", "Investigate") AS Remarks 
-                           FROM reconciliation.recon_outcome ro1 
-                           WHERE ((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund)) 
-                           AND ro1.Txn_RefNo NOT IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-                           ORDER BY 1''',
-        
-        'RECON_INVESTIGATE': '''SELECT *, 
-                              IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                                 "Perfect", "Investigate") AS Remarks 
-                              FROM reconciliation.recon_outcome ro1 
-                              WHERE ((ro1.PTPP_Payment + ro1.PTPP_Refund) != (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund)) 
-                              AND ro1.Txn_RefNo NOT IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-                              ORDER BY 1''',
-        
-        'MANUAL_REFUND': '''SELECT *, 
-                           IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                              "Perfect", "Investigate") AS Remarks 
-                           FROM reconciliation.recon_outcome ro1 
-                           WHERE ro1.Txn_RefNo IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-                           ORDER BY 1'''
+# Rows fetched from MySQL and appended to the sheet at a time
+DEFAULT_CHUNK_SIZE = 10000
+# Excel's row limit, minus the header row; larger results continue on NAME_2, NAME_3, ...
+MAX_SHEET_ROWS = 1048575
+# Fetched chunks a sheet may hold while waiting for the writer
+QUEUE_CHUNKS = 4
+
+def get_chunk_size():
+    """Rows per fetch from .env (REPORT_CHUNK_SIZE)"""
+    try:
+        return max(int(os.getenv('REPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)), 1)
+    except ValueError:
+        return DEFAULT_CHUNK_SIZE
+
+def get_worker_count(sheet_count):
+    """Concurrent sheet queries from .env (REPORT_WORKERS), default one per sheet"""
+    try:
+        workers = int(os.getenv('REPORT_WORKERS', 0))
+    except ValueError:
+        workers = 0
+    return min(workers, sheet_count) if workers > 0 else sheet_count
+
+def add_sheet(workbook, title, columns):
+    """Create a write-only sheet with a bold header row"""
+    sheet = workbook.create_sheet(title)
+    header = []
+    for name in columns:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    return sheet
+
+def fetch_query_chunks(pool, query, params, chunk_size, chunks, stop):
+    """Reader thread: run one query on its own pooled connection and queue its rows.
+
+    Queues ('columns', names), then ('rows', rows) per chunk and finally
+    ('done', None), or ('error', exception) if the query fails. The queue is
+    bounded, so a sheet the writer has not reached yet waits after a few chunks.
+    """
+    conn = None
+    finished = False
+    try:
+        conn = pool.get_connection()
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(query, params)
+        if not put_until_stopped(chunks, ('columns', [column[0] for column in cursor.description]), stop):
+            return
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if not put_until_stopped(chunks, ('rows', rows), stop):
+                return
+        cursor.close()
+        finished = True
+        put_until_stopped(chunks, ('done', None), stop)
+    except Exception as e:
+        put_until_stopped(chunks, ('error', e), stop)
+    finally:
+        if conn is not None:
+            # A reader that stopped early still has unread rows, drop its connection
+            if finished:
+                conn.close()
+            else:
+                conn.discard()
+
+class SheetWriter:
+    """Appends rows to a write-only sheet, continuing on NAME_2, NAME_3, ... when full"""
+
+    def __init__(self, workbook, sheet_name, columns):
+        self.workbook = workbook
+        self.sheet_name = sheet_name
+        self.columns = columns
+        self.sheet = add_sheet(workbook, sheet_name, columns)
+        self.sheet_rows = 0
+        self.part = 1
+        self.total = 0
+
+    def append(self, row):
+        if self.sheet_rows == MAX_SHEET_ROWS:
+            self.part += 1
+            self.sheet = add_sheet(self.workbook, f"{self.sheet_name}_{self.part}", self.columns)
+            self.sheet_rows = 0
+        self.sheet.append(row)
+        self.sheet_rows += 1
+        self.total += 1
+
+def iter_chunk_queue(chunks):
+    """Yield (kind, payload) items from a reader's queue until it is done, re-raising its errors"""
+    while True:
+        kind, payload = chunks.get()
+        if kind == 'error':
+            raise payload
+        if kind == 'done':
+            return
+        yield kind, payload
+
+def write_sheet_chunks(workbook, sheet_name, chunks):
+    """Writer: append one sheet's queued chunks to the workbook, returns rows written"""
+    writer = None
+    for kind, payload in iter_chunk_queue(chunks):
+        if kind == 'columns':
+            writer = SheetWriter(workbook, sheet_name, payload)
+            continue
+        for row in payload:
+            writer.append(row)
+    return writer.total if writer else 0
+
+def write_recon_chunks(workbook, chunks):
+    """Writer: route the single-pass Recon_Outcome rows into the three recon sheets.
+
+    Rows end with (Remarks, is_manual); is_manual is only used for routing and
+    is not written. Returns {sheet: rows written}.
+    """
+    writers = {}
+    for kind, payload in iter_chunk_queue(chunks):
+        if kind == 'columns':
+            writers = {sheet_name: SheetWriter(workbook, sheet_name, payload[:-1]) for sheet_name in RECON_SHEET_FILTERS}
+            continue
+        for row in payload:
+            sheet_name = recon_sheet_name(row[-1], row[-2])
+            if sheet_name is not None:
+                writers[sheet_name].append(row[:-1])
+    return {sheet_name: writer.total for sheet_name, writer in writers.items()}
+
+def previous_sheet_names(previous, sheet_name):
+    """The sheet and its overflow parts (NAME_2, NAME_3, ...) in a previous workbook"""
+    return [
+        name for name in previous.sheetnames
+        if name == sheet_name or (name.startswith(sheet_name + '_') and name[len(sheet_name) + 1:].isdigit())
+    ]
+
+def _cell_value(cell):
+    # Read-only workbooks hand dates back as midnight datetimes, keep them dates
+    value = cell.value
+    if isinstance(value, datetime) and cell.is_date and 'h' not in cell.number_format.lower() and value.time() == dt_time():
+        return value.date()
+    return value
+
+def copy_previous_sheet(workbook, previous, sheet_name):
+    """Writer: copy an unchanged sheet from the previous workbook, returns rows copied"""
+    total = 0
+    for name in previous_sheet_names(previous, sheet_name):
+        rows = previous[name].iter_rows()
+        header = next(rows, ())
+        sheet = add_sheet(workbook, name, [cell.value for cell in header])
+        for row in rows:
+            sheet.append([_cell_value(cell) for cell in row])
+            total += 1
+    return total
+
+def write_report(workbook, pool, queries, chunk_size, workers, previous=None, reuse=(), recon_query=None):
+    """Fetch every sheet concurrently and write them in the order of `queries`.
+
+    `queries` maps sheet name to (query, params). Each query runs on its own
+    pooled connection; this thread is the only one touching the workbook, so
+    sheets keep their fixed order. Sheets named in `reuse` are copied from the
+    `previous` workbook instead of being queried. With `recon_query` the three
+    recon sheets are filled from that single Recon_Outcome pass instead of
+    their own queries.
+    """
+    stop = threading.Event()
+    sheet_chunks = {sheet_name: queue.Queue(maxsize=QUEUE_CHUNKS) for sheet_name in queries}
+    recon_sheets = set(RECON_SHEET_FILTERS) if recon_query else set()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            recon_submitted = False
+            for sheet_name, (query, params) in queries.items():
+                if sheet_name in recon_sheets:
+                    if not recon_submitted:
+                        executor.submit(fetch_query_chunks, pool, *recon_query, chunk_size, sheet_chunks[sheet_name], stop)
+                        recon_submitted = True
+                elif sheet_name not in reuse:
+                    executor.submit(fetch_query_chunks, pool, query, params, chunk_size, sheet_chunks[sheet_name], stop)
+            recon_written = False
+            for sheet_name in queries:
+                if sheet_name in recon_sheets:
+                    if not recon_written:
+                        print("Processing RECON_SUCCESS, RECON_INVESTIGATE and MANUAL_REFUND in one pass...")
+                        for recon_sheet, rows in write_recon_chunks(workbook, sheet_chunks[sheet_name]).items():
+                            print(f"✅ {recon_sheet}: {rows} rows written after {time.perf_counter() - start:.2f}s")
+                        recon_written = True
+                    continue
+                if sheet_name in reuse:
+                    rows = copy_previous_sheet(workbook, previous, sheet_name)
+                    print(f"♻️ {sheet_name}: unchanged, {rows} rows reused")
+                    continue
+                print(f"Processing {sheet_name}...")
+                rows = write_sheet_chunks(workbook, sheet_name, sheet_chunks[sheet_name])
+                print(f"✅ {sheet_name}: {rows} rows written after {time.perf_counter() - start:.2f}s")
+        finally:
+            stop.set()
+
+def _fingerprint(row_count, checksum):
+    return {'rows': int(row_count or 0), 'checksum': str(checksum or 0)}
+
+def run_fingerprint_query(pool, query, params):
+    """All rows of one fingerprint query"""
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, tuple(params) or None)
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return rows
+
+def _distinct_fingerprint_queries(sheet_names, date_from=None, date_to=None, per_day=False):
+    # Sheets backed by the same data (SUMMARY and RAWDATA) share one query
+    queries = {}
+    for sheet_name in sheet_names:
+        query, params = build_fingerprint_query(sheet_name, date_from, date_to, per_day)
+        queries.setdefault((query, tuple(params)), []).append(sheet_name)
+    return queries
+
+def read_fingerprints(pool, sheet_names, workers, date_from=None, date_to=None):
+    """Row count and checksum of the data behind each sheet, each distinct query runs once"""
+    queries = _distinct_fingerprint_queries(sheet_names, date_from, date_to)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda key: run_fingerprint_query(pool, *key), queries))
+    return {
+        sheet_name: _fingerprint(*rows[0])
+        for shared_sheets, rows in zip(queries.values(), results) for sheet_name in shared_sheets
     }
 
+def read_daily_fingerprints(pool, sheet_names, workers):
+    """{day: {sheet: fingerprint}} for every Txn_Date, one grouped pass per distinct query.
+
+    Days a sheet has no rows for get the same fingerprint an empty
+    single-day query would give.
+    """
+    queries = _distinct_fingerprint_queries(sheet_names, per_day=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda key: run_fingerprint_query(pool, *key), queries))
+    daily = {}
+    for shared_sheets, rows in zip(queries.values(), results):
+        for day, row_count, checksum in rows:
+            for sheet_name in shared_sheets:
+                daily.setdefault(day, {})[sheet_name] = _fingerprint(row_count, checksum)
+    empty = _fingerprint(0, 0)
+    return {day: {sheet_name: fingerprints.get(sheet_name, empty) for sheet_name in sheet_names}
+            for day, fingerprints in daily.items()}
+
+def load_manifest(manifest_file):
+    """Per-sheet fingerprints recorded with the previous report, {} if there is none"""
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def use_single_pass_recon(queries, reuse):
+    """Read the recon sheets in one pass when they are adjacent and all need rewriting"""
+    if os.getenv('REPORT_SINGLE_PASS_RECON', '1') == '0':
+        return False
+    names = list(queries)
+    recon_sheets = list(RECON_SHEET_FILTERS)
+    if not set(recon_sheets) <= set(names) or reuse & set(recon_sheets):
+        return False
+    first = names.index(recon_sheets[0])
+    return names[first:first + len(recon_sheets)] == recon_sheets
+
+def generate_report(pool, output_file, queries, chunk_size, workers, date_from=None, date_to=None, force=False,
+                    fingerprints=None):
+    """Write one workbook, re-querying only the sheets whose data changed since the last run.
+
+    A manifest of per-sheet row counts and checksums is kept next to the
+    workbook; pass `fingerprints` when they were read already, e.g. for all
+    days at once. Returns False if every sheet was unchanged and nothing was written.
+    """
+    manifest_file = output_file.with_name(output_file.name + '.manifest.json')
+    manifest = {} if force or not output_file.exists() else load_manifest(manifest_file)
+
+    if fingerprints is None:
+        fingerprints = read_fingerprints(pool, queries, workers, date_from, date_to)
+    reuse = {sheet_name for sheet_name in queries if manifest.get(sheet_name) == fingerprints[sheet_name]}
+    if len(reuse) == len(queries):
+        print(f"♻️ {output_file.name} is up to date")
+        return False
+
+    previous = load_workbook(output_file, read_only=True) if reuse else None
+    temp_file = output_file.with_name(output_file.stem + '.tmp' + output_file.suffix)
     try:
-        # Connect to MySQL using .env config
-        print("Connecting to MySQL...")
-        conn = mysql.connector.connect(**get_db_config())
-        print("Connection successful!")
+        # Write-only workbook: rows are streamed to disk as they arrive
+        workbook = Workbook(write_only=True)
+        recon_query = None
+        if use_single_pass_recon(queries, reuse):
+            query, params = build_recon_outcome_query(date_from, date_to)
+            recon_query = (query, tuple(params) or None)
+        write_report(workbook, pool, queries, chunk_size, workers, previous, reuse, recon_query)
+        workbook.save(temp_file)
+    finally:
+        if previous is not None:
+            previous.close()
+    os.replace(temp_file, output_file)
+
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=2)
+    return True
+
+def list_report_days(pool):
+    """Every transaction date in the database"""
+    conn = pool.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(REPORT_DAYS_QUERY)
+        days = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    finally:
+        conn.close()
+    return days
+
+def main():
+    """Write Output_Files/recon_output.xlsx, rewriting only the sheets whose data changed.
+
+    python Generate_Recon_Output.py [--per-day] [--force]
+      --per-day  also write Output_Files/daily/recon_output_YYYY-MM-DD.xlsx per Txn_Date
+      --force    ignore the manifest and rewrite every sheet
+    """
+    args = sys.argv[1:]
+    per_day = '--per-day' in args
+    force = '--force' in args
+
+    # Queries to extract data - shared with the API
+    queries = {sheet_name: (query, None) for sheet_name, query in QUERIES.items()}
+
+    try:
+        # One pooled MySQL connection per concurrently fetched sheet, using .env config
+        workers = get_worker_count(len(queries))
+        pool = ConnectionPool(get_db_config(), size=workers)
+        print(f"Fetching {len(queries)} sheets with {workers} connections...")
 
         # Auto-detect output path
         BASE_DIR = Path(__file__).parent.resolve()
         OUTPUT_FOLDER = BASE_DIR / 'Output_Files'
         OUTPUT_FOLDER.mkdir(exist_ok=True)
         output_file = OUTPUT_FOLDER / 'recon_output.xlsx'
+        chunk_size = get_chunk_size()
 
-        # Create a Pandas ExcelWriter to write multiple sheets
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            for sheet_name, query in queries.items():
-                print(f"Processing {sheet_name}...")
-                # Execute the query
-                df = pd.read_sql(query, conn)
-                
-                # Write the dataframe to an Excel sheet
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                print(f"✅ {sheet_name}: {len(df)} rows written")
-
-        # Close the MySQL connection
-        conn.close()
-        print(f"✅ Data has been successfully written to {output_file}")
+        try:
+            if generate_report(pool, output_file, queries, chunk_size, workers, force=force):
+                print(f"✅ Data has been successfully written to {output_file}")
+
+            if per_day:
+                DAILY_FOLDER = OUTPUT_FOLDER / 'daily'
+                DAILY_FOLDER.mkdir(exist_ok=True)
+                written = 0
+                # Every day's fingerprints come from one grouped pass per distinct query
+                daily_fingerprints = read_daily_fingerprints(pool, QUERIES, workers)
+                empty_day = {sheet_name: _fingerprint(0, 0) for sheet_name in QUERIES}
+                for day in list_report_days(pool):
+                    day_queries = {}
+                    for sheet_name in QUERIES:
+                        query, params = build_sheet_query(sheet_name, day, day)
+                        day_queries[sheet_name] = (query, tuple(params))
+                    day_file = DAILY_FOLDER / f"recon_output_{day:%Y-%m-%d}.xlsx"
+                    written += generate_report(pool, day_file, day_queries, chunk_size, workers, day, day, force,
+                                               daily_fingerprints.get(day, empty_day))
+                print(f"✅ {written} daily report(s) written to {DAILY_FOLDER}")
+        finally:
+            # Close the MySQL connections
+            pool.close_all()
 
     except mysql.connector.Error as e:
         print(f"❌ Database error: {e}")
@@ -127,4 +444,4 @@ def main():
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
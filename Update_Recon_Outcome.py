@@ -0,0 +1,53 @@
+import sys
+import time
+
+from mysql.connector import Error
+
+from bulk_loader import create_connection
+from load_ledger import ensure_ledger_tables
+from recon_engine import (build_recon_outcome, last_pending_id, load_transactions,
+                          refresh_pending_outcome, write_recon_outcome)
+
+
+def report_outcome(outcome, start):
+    """Print the Perfect/Investigate/Manual split of a recon run"""
+    remarks = outcome['status'].value_counts()
+    print(f"🔄 {len(outcome)} reference numbers reconciled in {time.perf_counter() - start:.2f}s "
+          f"(Perfect: {remarks.get('Perfect', 0)}, Investigate: {remarks.get('Investigate', 0)}, "
+          f"Manual: {int(outcome['is_manual'].sum())})")
+
+
+def main():
+    """Update Recon_Outcome for newly loaded reference numbers, or rebuild it with --full"""
+    full = '--full' in sys.argv[1:]
+    connection = create_connection()
+    if not connection:
+        print("❌ Failed to connect to database")
+        return
+
+    try:
+        ensure_ledger_tables(connection)
+        start = time.perf_counter()
+        if full:
+            last_id = last_pending_id(connection)
+            transactions = load_transactions(connection)
+            print(f"📄 {len(transactions)} transactions read")
+            outcome = build_recon_outcome(transactions)
+            report_outcome(outcome, start)
+            write_recon_outcome(connection, outcome, last_id)
+        else:
+            outcome = refresh_pending_outcome(connection)
+            if outcome is None:
+                print("ℹ️ No new reference numbers to reconcile")
+                return
+            report_outcome(outcome, start)
+        print("✅ Recon_Outcome updated successfully!")
+    except Error as e:
+        print(f"❌ Database error: {e}")
+        connection.rollback()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2668,14 +2668,13 @@
 
 import os
 from pathlib import Path
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, Response
 from flask_cors import CORS
 import mysql.connector
 import pandas as pd
 from datetime import datetime
 import logging
 import traceback
-from decimal import Decimal
 import os
 import subprocess
 import threading
@@ -2685,12 +2684,24 @@ import zipfile
 import shutil
 import json
 import sys
+import base64
+from dotenv import load_dotenv
+
+from db_pool import ConnectionPool
+from result_cache import ResultCache
+from row_serializer import FastJSONProvider, rows_to_dicts
+from sheet_export import EXPORT_FORMATS, export_cursor, format_available
+from recon_queries import (QUERIES, RECON_SHEET_FILTERS, build_recon_counts_query, build_recon_outcome_query,
+                           build_sheet_query, build_summary_stats_query, date_range_condition, recon_sheet_name)  # Sheet queries, shared with Generate_Recon_Output.py
 
 
 
 
 BASE_DIR = Path(__file__).parent.resolve()
 
+# Load environment variables from .env file (pool, cache and export settings below)
+load_dotenv(BASE_DIR / '.env')
+
 # Build paths relative to the app.py location
 UPLOAD_FOLDER = BASE_DIR / 'Input_Files'
 BATCH_FILES = [
@@ -2706,6 +2717,7 @@ ALLOWED_EXTENSIONS = {'zip', 'xlsx', 'xls'}
 MAX_FILE_SIZE = 50 * 1024 * 1024
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed, same output as Flask's default
 CORS(app)
 
 
@@ -2721,6 +2733,24 @@ DB_CONFIG = {
     'database': 'reconciliation'
 }
 
+# Connection pool settings - one pool shared by every request thread
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+DB_POOL_PING_INTERVAL = float(os.getenv('DB_POOL_PING_INTERVAL', 5))
+
+db_pool = ConnectionPool(
+    DB_CONFIG,
+    size=DB_POOL_SIZE,
+    checkout_timeout=DB_POOL_TIMEOUT,
+    ping_interval=DB_POOL_PING_INTERVAL
+)
+
+# Sheet results only change when a processing run loads new data
+result_cache = ResultCache(
+    max_entries=int(os.getenv('RESULT_CACHE_ENTRIES', 64)),
+    max_rows=int(os.getenv('RESULT_CACHE_MAX_ROWS', 500000))
+)
+
 
 # Get the directory where this script is located
 BASE_DIR = Path(__file__).parent.resolve()
@@ -2762,88 +2792,59 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # Create other required directories
 os.makedirs(BASE_DIR / 'Output_Files', exist_ok=True)
 
-# Database Queries - YOUR ORIGINAL QUERIES
-QUERIES = {
-    'SUMMARY': """
-        (SELECT txn_source, Txn_type, sum(Txn_Amount) FROM reconciliation.payment_refund pr GROUP BY 1, 2) 
-        UNION 
-        (SELECT Txn_Source, Txn_type, sum(Txn_Amount) FROM reconciliation.paytm_phonepe pp GROUP BY 1, 2)
-    """,
+# Sheets that can be paged with a Txn_RefNo keyset cursor
+KEYSET_SHEETS = {'RAWDATA', 'RECON_SUCCESS', 'RECON_INVESTIGATE', 'MANUAL_REFUND'}
+# UNION sheets whose branches are paged table by table
+PAGED_SHEET_TABLES = {
+    'RAWDATA': ['reconciliation.paytm_phonepe', 'reconciliation.payment_refund']
+}
+COUNT_QUERIES = {
     'RAWDATA': """
-        (SELECT * FROM reconciliation.paytm_phonepe pp) 
-        UNION ALL 
-        (SELECT * FROM reconciliation.payment_refund pr)
-    """,
-    'RECON_SUCCESS': """
-        SELECT *, 
-               IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                  "Perfect", "Investigate") AS Remarks 
-        FROM reconciliation.recon_outcome ro1 
-        WHERE ((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund)) 
-        AND ro1.Txn_RefNo NOT IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-        ORDER BY 1
-    """,
-    'RECON_INVESTIGATE': """
-        SELECT *, 
-               IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                  "Perfect", "Investigate") AS Remarks 
-        FROM reconciliation.recon_outcome ro1 
-        WHERE ((ro1.PTPP_Payment + ro1.PTPP_Refund) != (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund)) 
-        AND ro1.Txn_RefNo NOT IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-        ORDER BY 1
-    """,
-    'MANUAL_REFUND': """
-        SELECT *, 
-               IF((ro1.PTPP_Payment + ro1.PTPP_Refund) = (ro1.Cloud_Payment + ro1.Cloud_Refund + ro1.Cloud_MRefund),
-                  "Perfect", "Investigate") AS Remarks 
-        FROM reconciliation.recon_outcome ro1 
-        WHERE ro1.Txn_RefNo IN (SELECT ro2.txn_refno FROM reconciliation.recon_outcome ro2 WHERE ro2.txn_mid like '%manual%') 
-        ORDER BY 1
+        SELECT (SELECT COUNT(*) FROM reconciliation.paytm_phonepe)
+             + (SELECT COUNT(*) FROM reconciliation.payment_refund) AS total
     """
 }
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+# Rows pulled from the server per fetchmany() call when streaming a sheet
+STREAM_FETCH_SIZE = 1000
+STREAM_FORMATS = {'ndjson': 'application/x-ndjson', 'json': 'application/json'}
+# Rows per Arrow record batch / csv.gz block in /api/reconciliation/export
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 50000))
 
 # YOUR ORIGINAL DATABASE FUNCTIONS - KEEP SIMPLE
 def get_db_connection():
-    """Create and return a database connection - YOUR ORIGINAL APPROACH"""
+    """Check out a pooled database connection; close() returns it to the pool"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = db_pool.get_connection()
         return conn
     except mysql.connector.Error as err:
         logger.error(f"Database connection error: {err}")
         return None
 
-def serialize_value(value):
-    """Convert various data types to JSON serializable format - YOUR ORIGINAL"""
-    if value is None:
-        return None
-    elif isinstance(value, datetime):
-        return value.isoformat()
-    elif isinstance(value, bytes):
-        return value.decode('utf-8', errors='ignore')
-    elif isinstance(value, Decimal):
-        return float(value)
-    else:
-        return value
-
-def execute_query(query):
+def execute_query(query, params=None, use_cache=False):
     """Execute a query and return results as a list of dictionaries - YOUR ORIGINAL"""
+    if use_cache:
+        cached = result_cache.get((query, params))
+        if cached is not None:
+            return cached
+        generation = result_cache.generation()
+    
     conn = get_db_connection()
     if not conn:
         return None
     
+    cursor = None
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
         results = cursor.fetchall()
         
-        # Convert any problematic data types for JSON serialization
-        serialized_results = []
-        for row in results:
-            serialized_row = {}
-            for key, value in row.items():
-                serialized_row[key] = serialize_value(value)
-            serialized_results.append(serialized_row)
+        # Convert problematic data types column by column for JSON serialization
+        serialized_results = rows_to_dicts(cursor.description, results)
         
+        if use_cache:
+            result_cache.put((query, params), serialized_results, rows=len(serialized_results), generation=generation)
         return serialized_results
     except mysql.connector.Error as err:
         logger.error(f"Query execution error: {err}")
@@ -2854,17 +2855,220 @@ def execute_query(query):
         logger.error(traceback.format_exc())
         return None
     finally:
-        if conn.is_connected():
+        # Always hand the connection back to the pool, even if it dropped
+        if cursor is not None and conn.is_connected():
+            cursor.close()
+        conn.close()
+
+def encode_cursor(last_refno):
+    """Build the opaque next_cursor token from the last Txn_RefNo of a page"""
+    payload = json.dumps({'after': last_refno}).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_cursor(token):
+    """Return the Txn_RefNo a cursor token points after, raises ValueError if invalid"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return str(payload['after'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_date_filters(args):
+    """Read date_from/date_to (YYYY-MM-DD) from the request args, raises ValueError if invalid"""
+    dates = []
+    for name in ('date_from', 'date_to'):
+        value = args.get(name)
+        if value:
+            try:
+                value = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f'Invalid {name}, expected YYYY-MM-DD')
+        dates.append(value or None)
+    return tuple(dates)
+
+def build_page_query(sheet, after_refno, fetch_size, date_from=None, date_to=None):
+    """Keyset query returning up to fetch_size rows of a sheet ordered by Txn_RefNo"""
+    condition = "" if after_refno is None else "WHERE Txn_RefNo > %s"
+    after_params = [after_refno] if after_refno is not None else []
+    if sheet in PAGED_SHEET_TABLES:
+        # Limit every UNION branch on its own so the Txn_RefNo index bounds each scan,
+        # and filter dates inside each branch so only the matching partitions are read
+        date_condition, date_params = date_range_condition('Txn_Date', date_from, date_to)
+        conditions = [c for c in (condition[len("WHERE "):], date_condition) if c]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        branches = [
+            f"(SELECT * FROM {table} {where} ORDER BY Txn_RefNo LIMIT %s)"
+            for table in PAGED_SHEET_TABLES[sheet]
+        ]
+        query = f"{' UNION ALL '.join(branches)} ORDER BY Txn_RefNo LIMIT %s"
+        branch_params = after_params + date_params + [fetch_size]
+        params = branch_params * len(branches) + [fetch_size]
+    else:
+        sheet_query, sheet_params = build_sheet_query(sheet, date_from, date_to)
+        query = f"SELECT * FROM ({sheet_query}) AS sheet_rows {condition} ORDER BY Txn_RefNo LIMIT %s"
+        params = sheet_params + after_params + [fetch_size]
+    return query, tuple(params)
+
+def fetch_sheet_page(sheet, page_size, after_refno=None, date_from=None, date_to=None):
+    """Fetch one keyset page of a sheet, returns (rows, next_cursor) or (None, None) on error.
+
+    Pages always end on a Txn_RefNo boundary, so the cursor is simply the last
+    Txn_RefNo returned and no OFFSET is needed. NULL reference numbers sort
+    first and are only returned on the first page.
+    """
+    query, params = build_page_query(sheet, after_refno, page_size + 1, date_from, date_to)
+    rows = execute_query(query, params, use_cache=True)
+    if rows is None or len(rows) <= page_size:
+        return rows, None
+
+    # More rows remain: drop the trailing Txn_RefNo group, it may be incomplete
+    last_refno = rows[page_size]['Txn_RefNo']
+    page = [row for row in rows[:page_size] if row['Txn_RefNo'] != last_refno]
+    if not page:
+        # A single Txn_RefNo spans the whole page - return that group in full
+        sheet_query, sheet_params = build_sheet_query(sheet, date_from, date_to)
+        if last_refno is None:
+            group_query = f"SELECT * FROM ({sheet_query}) AS sheet_rows WHERE Txn_RefNo IS NULL"
+            page = execute_query(group_query, tuple(sheet_params), use_cache=True)
+        else:
+            group_query = f"SELECT * FROM ({sheet_query}) AS sheet_rows WHERE Txn_RefNo = %s"
+            page = execute_query(group_query, tuple(sheet_params + [last_refno]), use_cache=True)
+        if page is None:
+            return None, None
+    else:
+        last_refno = page[-1]['Txn_RefNo']
+    # '' sorts after NULL, so a cursor after the NULL group skips to real reference numbers
+    return page, encode_cursor('' if last_refno is None else last_refno)
+
+def open_stream_cursor(query, params=None):
+    """Execute a query on an unbuffered cursor, returns (conn, cursor) with rows left on the server"""
+    conn = get_db_connection()
+    if not conn:
+        raise mysql.connector.Error(msg='Database connection failed')
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return conn, cursor
+    except Exception:
+        conn.discard()
+        raise
+
+def stream_response(conn, cursor, body, description, state, **kwargs):
+    """Response streaming `body`, a generator over `cursor`, that releases the connection when closed.
+
+    The WSGI server closes every response, even when the client disconnects
+    before the first chunk, so the connection always goes back exactly once.
+    It is only reused if the generator read every row (state['finished']),
+    otherwise it still holds unread rows and is dropped.
+    """
+    def release():
+        if state['finished']:
             cursor.close()
             conn.close()
+        else:
+            logger.warning(f"{description} stopped after {state.get('count', 0)} rows")
+            conn.discard()
+
+    response = Response(body, **kwargs)
+    response.call_on_close(release)
+    return response
+
+def iter_stream_batches(cursor, fmt, sheet, state, fetch_size=STREAM_FETCH_SIZE):
+    """Yield the rows of an open cursor as NDJSON lines or one chunked JSON document.
+
+    Only fetch_size rows are held in memory at a time, so memory stays flat
+    whatever the sheet size. Sets state['finished'] once every row was sent.
+    """
+    state['count'] = 0
+    if fmt == 'json':
+        yield f'{{"sheet": {json.dumps(sheet)}, "status": "success", "data": ['
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        rows = rows_to_dicts(cursor.description, rows)
+        if fmt == 'json':
+            # One encoder call per batch, minus the enclosing brackets
+            yield (',' if state['count'] else '') + app.json.dumps(rows)[1:-1]
+        else:
+            yield '\n'.join(app.json.dumps(row) for row in rows) + '\n'
+        state['count'] += len(rows)
+    if fmt == 'json':
+        yield f'], "count": {state["count"]}, "timestamp": {json.dumps(datetime.now().isoformat())}}}'
+    state['finished'] = True
+
+def iter_export_chunks(cursor, fmt, state):
+    """Yield a sheet export file chunk by chunk, sets state['finished'] at the end"""
+    yield from export_cursor(cursor, fmt, EXPORT_BATCH_SIZE)
+    state['finished'] = True
+
+def fetch_recon_sheets(date_from=None, date_to=None):
+    """Read the three recon sheets in one pass over Recon_Outcome and cache each of them.
+
+    Returns {sheet: rows}, or None on a database error. Requests for the
+    other two sheets are then answered from the result cache.
+    """
+    query, params = build_recon_outcome_query(date_from, date_to)
+    generation = result_cache.generation()
+    rows = execute_query(query, tuple(params) or None)
+    if rows is None:
+        return None
+    
+    sheets = {sheet: [] for sheet in RECON_SHEET_FILTERS}
+    for row in rows:
+        sheet = recon_sheet_name(row.pop('is_manual'), row['Remarks'])
+        if sheet is not None:
+            sheets[sheet].append(row)
+    for sheet, sheet_rows in sheets.items():
+        sheet_query, sheet_params = build_sheet_query(sheet, date_from, date_to)
+        result_cache.put((sheet_query, tuple(sheet_params) or None), sheet_rows, rows=len(sheet_rows),
+                         generation=generation)
+    return sheets
+
+def recon_sheet_counts(date_from=None, date_to=None):
+    """Row count of each recon sheet from one grouped count over Recon_Outcome, None on a database error"""
+    query, params = build_recon_counts_query(date_from, date_to)
+    rows = execute_query(query, tuple(params) or None, use_cache=True)
+    if rows is None:
+        return None
+    counts = {sheet: 0 for sheet in RECON_SHEET_FILTERS}
+    for row in rows:
+        sheet = recon_sheet_name(row['is_manual'], row['status'])
+        if sheet is not None:
+            counts[sheet] += int(row['row_count'])
+    return counts
+
+def fetch_recon_sheet(sheet, date_from=None, date_to=None):
+    """Rows of one full recon sheet, None on a database error.
+
+    When all three recon sheets fit in the result cache they are read in one
+    pass and cached together. Otherwise the shared pass would be thrown away
+    and repeated on every request, so only this sheet's indexed query runs.
+    """
+    counts = recon_sheet_counts(date_from, date_to)
+    if counts is not None and sum(counts.values()) <= result_cache.max_rows:
+        sheets = fetch_recon_sheets(date_from, date_to)
+        return sheets[sheet] if sheets is not None else None
+    query, params = build_sheet_query(sheet, date_from, date_to)
+    return execute_query(query, tuple(params) or None, use_cache=True)
+
+def count_sheet_rows(sheet, date_from=None, date_to=None):
+    """Total row count of a sheet from a separate, cheaper count query"""
+    if sheet in COUNT_QUERIES and date_from is None and date_to is None:
+        query, params = COUNT_QUERIES[sheet], None
+    else:
+        sheet_query, sheet_params = build_sheet_query(sheet, date_from, date_to)
+        query, params = f"SELECT COUNT(*) AS total FROM ({sheet_query}) AS sheet_rows", tuple(sheet_params)
+    rows = execute_query(query, params, use_cache=True)
+    return int(rows[0]['total']) if rows else None
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def calculate_summary_stats(data):
-    """Calculate summary statistics from the data"""
+def calculate_summary_stats(date_from=None, date_to=None):
+    """Calculate RAWDATA summary statistics with one GROUP BY ... WITH ROLLUP in MySQL"""
     summary = {
         'total_transactions': 0,
         'total_amount': 0,
@@ -2872,27 +3076,26 @@ def calculate_summary_stats(data):
         'by_type': {}
     }
     
-    # Process RAWDATA for summary statistics
-    if 'RAWDATA' in data:
-        rawdata = data['RAWDATA']
-        summary['total_transactions'] = len(rawdata)
-        
-        for row in rawdata:
-            amount = float(row.get('Txn_Amount', 0))
-            summary['total_amount'] += amount
-            
-            source = row.get('Txn_Source', 'Unknown')
-            txn_type = row.get('Txn_Type', 'Unknown')
-            
-            if source not in summary['by_source']:
-                summary['by_source'][source] = {'count': 0, 'amount': 0}
-            summary['by_source'][source]['count'] += 1
-            summary['by_source'][source]['amount'] += amount
-            
-            if txn_type not in summary['by_type']:
-                summary['by_type'][txn_type] = {'count': 0, 'amount': 0}
-            summary['by_type'][txn_type]['count'] += 1
-            summary['by_type'][txn_type]['amount'] += amount
+    query, params = build_summary_stats_query(date_from, date_to)
+    rows = execute_query(query, tuple(params) or None, use_cache=True)
+    if not rows:
+        return summary
+    
+    for row in rows:
+        count = int(row['txn_count'] or 0)
+        amount = float(row['amount'] or 0)
+        if row['all_sources']:
+            # Grand total
+            summary['total_transactions'] = count
+            summary['total_amount'] = amount
+        elif row['all_types']:
+            # Per-source subtotal
+            summary['by_source'][row['Txn_Source'] or 'Unknown'] = {'count': count, 'amount': amount}
+        else:
+            # Types span sources, so add up the (source, type) rows
+            by_type = summary['by_type'].setdefault(row['Txn_Type'] or 'Unknown', {'count': 0, 'amount': 0})
+            by_type['count'] += count
+            by_type['amount'] += amount
     
     return summary
 
@@ -3107,11 +3310,16 @@ def run_batch_files():
             'message': 'Process failed'
         })
         logger.error(f"💥 Exception: {error_msg}")
+    finally:
+        # The run reloaded (or truncated) the tables, cached sheets are stale
+        result_cache.invalidate()
 # API ROUTES
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Enhanced health check - BASED ON YOUR ORIGINAL BUT ENHANCED"""
+    conn = None
+    failed = False
     try:
         conn = get_db_connection()
         if conn and conn.is_connected():
@@ -3119,7 +3327,6 @@ def health_check():
             cursor.execute("SELECT 1")
             cursor.fetchone()
             cursor.close()
-            conn.close()
             
             return jsonify({
                 "status": "healthy",
@@ -3127,24 +3334,36 @@ def health_check():
                 "database_connected": True,  # Added for Flutter compatibility
                 "timestamp": datetime.now().isoformat(),
                 "upload_folder": str(UPLOAD_FOLDER),
-                "batch_files_configured": len(BATCH_FILES)
+                "batch_files_configured": len(BATCH_FILES),
+                "pool": db_pool.metrics(),
+                "cache": result_cache.stats()
             })
         else:
             return jsonify({
                 "status": "unhealthy",
                 "database": "disconnected", 
                 "database_connected": False,  # Added for Flutter compatibility
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                "pool": db_pool.metrics()
             }), 500
     except Exception as e:
+        failed = True
         logger.error(f"Health check error: {e}")
         return jsonify({
             "status": "error",
             "database": "error",
             "database_connected": False,  # Added for Flutter compatibility
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "pool": db_pool.metrics()
         }), 500
+    finally:
+        # Always hand the connection back; one that failed may be broken, so drop it
+        if conn:
+            if failed:
+                conn.discard()
+            else:
+                conn.close()
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -3299,20 +3518,48 @@ def get_reconciliation_data():
     try:
         sheet = request.args.get('sheet', 'RAWDATA')
         limit = request.args.get('limit', type=int)
+        page_size = request.args.get('page_size', type=int)
+        cursor_token = request.args.get('cursor')
         
         if sheet not in QUERIES:
             return jsonify({'error': f'Invalid sheet parameter. Available: {list(QUERIES.keys())}'}), 400
         
-        query = QUERIES[sheet]
+        try:
+            date_from, date_to = parse_date_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if (page_size or cursor_token) and sheet in KEYSET_SHEETS:
+            return get_reconciliation_page(sheet, page_size, cursor_token, date_from, date_to)
+        
+        query, params = build_sheet_query(sheet, date_from, date_to)
+        params = tuple(params) or None
         if limit and limit > 0:
             query += f" LIMIT {limit}"
         
-        data = execute_query(query)
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify({'error': f'Invalid stream parameter. Available: {list(STREAM_FORMATS.keys())}'}), 400
+            conn, cursor = open_stream_cursor(query, params)
+            state = {'finished': False}
+            return stream_response(
+                conn, cursor, iter_stream_batches(cursor, stream_format, sheet, state),
+                f"Stream for {sheet}", state, mimetype=STREAM_FORMATS[stream_format]
+            )
+        
+        if sheet in RECON_SHEET_FILTERS and not (limit and limit > 0):
+            # Full recon sheets come from one shared pass over Recon_Outcome
+            data = result_cache.get((query, params))
+            if data is None:
+                data = fetch_recon_sheet(sheet, date_from, date_to)
+        else:
+            data = execute_query(query, params, use_cache=True)
         
         if data is None:
             return jsonify({'error': f'Failed to execute query for {sheet}'}), 500
         
-        summary_stats = calculate_summary_stats({sheet: data}) if sheet == 'RAWDATA' else {}
+        summary_stats = calculate_summary_stats(date_from, date_to) if sheet == 'RAWDATA' else {}
         
         return jsonify({
             'data': data,
@@ -3327,11 +3574,76 @@ def get_reconciliation_data():
         logger.error(f"Error fetching reconciliation data: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def get_reconciliation_page(sheet, page_size, cursor_token, date_from=None, date_to=None):
+    """Keyset-paged variant of /api/reconciliation/data"""
+    page_size = min(max(page_size or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    try:
+        after_refno = decode_cursor(cursor_token) if cursor_token else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    data, next_cursor = fetch_sheet_page(sheet, page_size, after_refno, date_from, date_to)
+    if data is None:
+        return jsonify({'error': f'Failed to execute query for {sheet}'}), 500
+    
+    # Totals only on the first page unless asked for, the count is a separate query
+    include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+    first_page = cursor_token is None
+    total_count = count_sheet_rows(sheet, date_from, date_to) if (first_page or include_total) else None
+    summary_stats = calculate_summary_stats(date_from, date_to) if (sheet == 'RAWDATA' and first_page) else {}
+    
+    return jsonify({
+        'data': data,
+        'count': len(data),
+        'sheet': sheet,
+        'page_size': page_size,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'total_count': total_count,
+        'summary': summary_stats,
+        'timestamp': datetime.now().isoformat(),
+        'status': 'success'
+    })
+
+@app.route('/api/reconciliation/export', methods=['GET'])
+def export_reconciliation_data():
+    """Download a sheet as parquet, arrow or csv.gz, streamed straight from the database"""
+    try:
+        sheet = request.args.get('sheet', 'RAWDATA')
+        fmt = request.args.get('format', 'parquet')
+        
+        if sheet not in QUERIES:
+            return jsonify({'error': f'Invalid sheet parameter. Available: {list(QUERIES.keys())}'}), 400
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format parameter. Available: {list(EXPORT_FORMATS.keys())}'}), 400
+        if not format_available(fmt):
+            return jsonify({'error': f'Export format {fmt} needs pyarrow, which is not installed'}), 501
+        
+        try:
+            date_from, date_to = parse_date_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query, params = build_sheet_query(sheet, date_from, date_to)
+        conn, cursor = open_stream_cursor(query, tuple(params) or None)
+        mimetype, extension, _ = EXPORT_FORMATS[fmt]
+        filename = f"{sheet}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+        state = {'finished': False}
+        return stream_response(
+            conn, cursor, iter_export_chunks(cursor, fmt, state), f"Export of {sheet} as {fmt}", state,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except Exception as e:
+        logger.error(f"Error exporting reconciliation data: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/reconciliation/summary', methods=['GET'])
 def get_summary():
     """Get summary statistics - YOUR ORIGINAL"""
     try:
-        data = execute_query(QUERIES['SUMMARY'])
+        data = execute_query(QUERIES['SUMMARY'], use_cache=True)
         
         if data is None:
             return jsonify({'error': 'Failed to execute summary query'}), 500
@@ -3356,15 +3668,17 @@ def refresh_data():
         if not conn:
             return jsonify({'error': 'Database connection failed'}), 500
         
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM reconciliation.paytm_phonepe")
-        paytm_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM reconciliation.payment_refund")
-        payment_count = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM reconciliation.paytm_phonepe")
+            paytm_count = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(*) FROM reconciliation.payment_refund")
+            payment_count = cursor.fetchone()[0]
+            
+            cursor.close()
+        finally:
+            conn.close()
         
         return jsonify({
             'message': 'Data refresh completed',
@@ -3648,6 +3962,9 @@ def run_batch_files():
         })
         logger.error(f"💥 Exception in batch execution: {error_msg}")
         logger.error(traceback.format_exc())
+    finally:
+        # The run reloaded (or truncated) the tables, cached sheets are stale
+        result_cache.invalidate()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,310 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+from db_pool import ConnectionPool
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Supported load strategies:
+#   executemany - batched cursor.executemany() in chunks of LOAD_CHUNK_SIZE rows
+#   multirow    - one INSERT ... VALUES (...), (...), ... statement per chunk
+#   infile      - LOAD DATA LOCAL INFILE straight from the normalized CSV, a frame
+#                 without one is written to a temporary CSV first
+LOAD_STRATEGIES = ('executemany', 'multirow', 'infile')
+DEFAULT_STRATEGY = 'executemany'
+DEFAULT_CHUNK_SIZE = 5000
+# Session settings for the connections of a sharded load. The loaded tables have no
+# unique or foreign keys, so InnoDB can skip those checks per row.
+LOAD_SESSION_SETTINGS = "SET SESSION autocommit = 0, unique_checks = 0, foreign_key_checks = 0"
+RESTORE_SESSION_SETTINGS = "SET SESSION unique_checks = 1, foreign_key_checks = 1"
+
+
+def get_db_config():
+    """Get database configuration from .env file"""
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_DATABASE'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        **get_connection_options()
+    }
+
+
+def create_connection():
+    """Establish a MySQL connection using .env config"""
+    try:
+        connection = mysql.connector.connect(**get_db_config())
+        if connection.is_connected():
+            print("Connection to MySQL is successful!")
+            return connection
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+def get_connection_options():
+    """Extra mysql.connector options needed by the configured strategy"""
+    strategy, _ = get_load_settings()
+    return {'allow_local_infile': True} if strategy == 'infile' else {}
+
+
+def get_load_settings():
+    """Get bulk load strategy and chunk size from .env file"""
+    strategy = os.getenv('LOAD_STRATEGY', DEFAULT_STRATEGY).strip().lower()
+    if strategy not in LOAD_STRATEGIES:
+        print(f"⚠️ Unknown LOAD_STRATEGY '{strategy}', falling back to {DEFAULT_STRATEGY}")
+        strategy = DEFAULT_STRATEGY
+
+    try:
+        chunk_size = int(os.getenv('LOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    return strategy, max(chunk_size, 1)
+
+
+def get_load_workers():
+    """Connections a file is loaded over from .env (LOAD_WORKERS), 1 loads on the caller's connection"""
+    try:
+        return max(int(os.getenv('LOAD_WORKERS', 1)), 1)
+    except ValueError:
+        return 1
+
+
+def blank_mask(values):
+    """True where a column holds NaN/None or a whitespace-only string, checked without a regex"""
+    blank = values.isna()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Only the few distinct categories need checking
+        categories = values.cat.categories
+        blank |= values.isin(categories[categories.astype(str).str.strip() == ''])
+    elif isinstance(values.dtype, pd.StringDtype):
+        blank |= values.str.strip().eq('').fillna(False).astype(bool)
+    elif values.dtype == object:
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind == 'string':
+            blank |= values.str.strip().eq('')
+        elif kind.startswith('mixed'):
+            blank |= values.map(lambda value: isinstance(value, str) and not value.strip()).astype(bool)
+    return blank
+
+
+def clean_frame(df):
+    """Convert NaN and blank strings to None (NULL in MySQL)"""
+    return pd.DataFrame(
+        {name: values.astype(object).mask(blank_mask(values), None) for name, values in df.items()},
+        index=df.index
+    )
+
+
+def iter_chunks(rows, chunk_size):
+    """Yield consecutive slices of chunk_size rows"""
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+def _insert_executemany(cursor, table, columns, rows, chunk_size):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    inserted = 0
+    for chunk in iter_chunks(rows, chunk_size):
+        cursor.executemany(sql, chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def _insert_multirow(cursor, table, columns, rows, chunk_size):
+    row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+    inserted = 0
+    for chunk in iter_chunks(rows, chunk_size):
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_placeholder] * len(chunk))}"
+        params = [value for row in chunk for value in row]
+        cursor.execute(sql, params)
+        inserted += len(chunk)
+    return inserted
+
+
+def _load_infile(cursor, table, csv_file_path):
+    # Blank fields become NULL so the result matches the row-wise strategies
+    path = Path(csv_file_path).resolve().as_posix()
+    with open(csv_file_path, 'r', encoding='utf-8-sig') as f:
+        columns = [c.strip() for c in f.readline().strip().split(',')]
+    variables = [f"@{c}" for c in columns]
+    assignments = ', '.join(
+        f"{c} = NULLIF(TRIM(TRIM(TRAILING '\\r' FROM @{c})), '')" for c in columns
+    )
+    sql = (
+        f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+        f"CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+        f"LINES TERMINATED BY '\\n' IGNORE 1 LINES "
+        f"({', '.join(variables)}) SET {assignments}"
+    )
+    cursor.execute(sql)
+    return cursor.rowcount
+
+
+def _load_frame_infile(cursor, table, df):
+    # pandas quotes like the LOAD DATA clause expects and writes NaN/None as blank fields
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='', delete=False) as f:
+        df.to_csv(f, index=False, lineterminator='\n')
+    try:
+        return _load_infile(cursor, table, f.name)
+    finally:
+        os.remove(f.name)
+
+
+def bulk_insert(connection, table, df=None, csv_file_path=None, strategy=None, chunk_size=None):
+    """Bulk insert a DataFrame into a MySQL table.
+
+    With the infile strategy the rows are loaded from csv_file_path, the
+    normalized CSV of df, when given. Returns the number of rows inserted.
+    The caller owns the transaction; rows are only committed when the caller
+    commits.
+    """
+    default_strategy, default_chunk_size = get_load_settings()
+    strategy = strategy or default_strategy
+    chunk_size = chunk_size or default_chunk_size
+
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        inserted = _insert_frame(cursor, table, df, strategy, chunk_size, csv_file_path)
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    report_throughput(table, inserted, elapsed, strategy)
+    return inserted
+
+
+def _insert_frame(cursor, table, df, strategy, chunk_size, csv_file_path=None):
+    if strategy == 'infile' and csv_file_path is not None:
+        return _load_infile(cursor, table, csv_file_path)
+    if strategy == 'infile':
+        return _load_frame_infile(cursor, table, df)
+    df = clean_frame(df)
+    columns = list(df.columns)
+    rows = list(df.itertuples(index=False, name=None))
+    if strategy == 'multirow':
+        return _insert_multirow(cursor, table, columns, rows, chunk_size)
+    return _insert_executemany(cursor, table, columns, rows, chunk_size)
+
+
+def shard_frame(df, shards, key_column='Txn_RefNo'):
+    """Split a frame into `shards` frames by a stable hash of key_column"""
+    keys = pd.util.hash_pandas_object(df[key_column], index=False).to_numpy() % shards
+    return [df[keys == shard] for shard in range(shards)]
+
+
+def _run_session(connection, sql):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+class ShardedInsert:
+    """Insert frames into one table over several pooled connections, sharded by Txn_RefNo hash.
+
+    Every connection keeps one open transaction for the whole load, and a
+    RefNo always lands on the same connection. insert() loads the shards of
+    a frame concurrently and raises the first shard error once all shards
+    have finished; the caller then calls rollback(). commit() is meant for
+    when every insert succeeded. close() (or leaving a with block) gives
+    the connections their session settings back and closes them.
+    """
+
+    def __init__(self, table, workers, strategy=None, chunk_size=None):
+        default_strategy, default_chunk_size = get_load_settings()
+        self.table = table
+        self.workers = workers
+        self.strategy = strategy or default_strategy
+        self.chunk_size = chunk_size or default_chunk_size
+        self._pool = ConnectionPool(get_db_config(), size=workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._connections = []
+        self._stats = [{'rows': 0, 'elapsed': 0.0} for _ in range(workers)]
+        try:
+            for _ in range(workers):
+                connection = self._pool.get_connection()
+                self._connections.append(connection)
+                _run_session(connection, LOAD_SESSION_SETTINGS)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _insert_shard(self, shard, df):
+        start = time.perf_counter()
+        cursor = self._connections[shard].cursor()
+        try:
+            inserted = _insert_frame(cursor, self.table, df, self.strategy, self.chunk_size)
+        finally:
+            cursor.close()
+            self._stats[shard]['elapsed'] += time.perf_counter() - start
+        self._stats[shard]['rows'] += inserted
+        return inserted
+
+    def insert(self, df):
+        """Insert one frame spread over the shards, returns the number of rows inserted"""
+        futures = [
+            self._executor.submit(self._insert_shard, shard, frame)
+            for shard, frame in enumerate(shard_frame(df, self.workers)) if len(frame)
+        ]
+        wait(futures)
+        return sum(future.result() for future in futures)
+
+    def commit(self):
+        for connection in self._connections:
+            connection.commit()
+
+    def rollback(self):
+        for connection in self._connections:
+            try:
+                connection.rollback()
+            except Error:
+                pass
+
+    def close(self):
+        """Restore the session settings and release every connection"""
+        self._executor.shutdown()
+        for connection in self._connections:
+            try:
+                _run_session(connection, RESTORE_SESSION_SETTINGS)
+            except Error:
+                connection.discard()
+            else:
+                connection.close()
+        self._connections = []
+        self._pool.close_all()
+
+    def report(self, elapsed):
+        """Print each worker's throughput and the total rows/sec"""
+        for worker, stats in enumerate(self._stats, 1):
+            rate = stats['rows'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+            print(f"👷 Worker {worker}: {stats['rows']} rows in {stats['elapsed']:.2f}s ({rate:,.0f} rows/sec)")
+        rows = sum(stats['rows'] for stats in self._stats)
+        report_throughput(self.table, rows, elapsed, f"{self.strategy} x {self.workers} connections")
+
+
+def report_throughput(table, rows, elapsed, strategy):
+    """Print rows/sec for a completed load"""
+    rate = rows / elapsed if elapsed > 0 else float(rows)
+    print(f"📊 {rows} rows loaded into {table} in {elapsed:.2f}s "
+          f"({rate:,.0f} rows/sec, strategy={strategy})")
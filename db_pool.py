@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection became free within the checkout timeout"""
+
+
+class PooledConnection:
+    """Wrapper around a MySQL connection that returns it to the pool on close()"""
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def close(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool._release(connection)
+
+    def is_connected(self):
+        return self._connection is not None and self._connection.is_connected()
+
+    def discard(self):
+        """Close the underlying connection instead of returning it, e.g. with unread results"""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool._discard(connection, release=True)
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise PoolError("Connection was already returned to the pool")
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with liveness checks and metrics.
+
+    Connections are opened lazily up to `size`. A checkout that finds no idle
+    connection while the pool is full waits up to `checkout_timeout` seconds.
+    Connections idle for longer than `ping_interval` seconds are pinged before
+    being handed out and replaced if the server dropped them.
+    """
+
+    def __init__(self, config, size=5, checkout_timeout=10.0, ping_interval=5.0):
+        self.config = dict(config)
+        self.size = max(int(size), 1)
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, last_used)
+        self._in_use = 0
+        self._opened = 0
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._total_checkout_time = 0.0
+        self._max_checkout_time = 0.0
+
+    def get_connection(self, timeout=None):
+        """Check out a live connection, returns a PooledConnection"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+
+        with self._lock:
+            if not self._idle and self._in_use >= self.size:
+                self._waits += 1
+            while not self._idle and self._in_use >= self.size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(f"No database connection available within {timeout}s")
+                self._lock.wait(remaining)
+            idle = self._idle.popleft() if self._idle else None
+            self._in_use += 1
+
+        try:
+            connection = self._checkout(idle)
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._total_checkout_time += elapsed
+            self._max_checkout_time = max(self._max_checkout_time, elapsed)
+        return PooledConnection(self, connection)
+
+    def _checkout(self, idle):
+        if idle is not None:
+            connection, last_used = idle
+            if time.monotonic() - last_used < self.ping_interval:
+                return connection
+            try:
+                connection.ping(reconnect=False)
+                return connection
+            except mysql.connector.Error:
+                self._discard(connection)
+        connection = mysql.connector.connect(**self.config)
+        with self._lock:
+            self._opened += 1
+        return connection
+
+    def _discard(self, connection, release=False):
+        with self._lock:
+            self._discarded += 1
+            self._opened -= 1
+            if release:
+                self._in_use -= 1
+                self._lock.notify()
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+
+    def _release(self, connection):
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            healthy = True
+        except mysql.connector.Error:
+            healthy = False
+
+        if not healthy:
+            self._discard(connection)
+        with self._lock:
+            if healthy:
+                self._idle.append((connection, time.monotonic()))
+            self._in_use -= 1
+            self._lock.notify()
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+            self._opened -= len(idle)
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except mysql.connector.Error:
+                pass
+
+    def metrics(self):
+        """Snapshot of pool usage for the health endpoint"""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'discarded': self._discarded,
+                'avg_checkout_ms': round(self._total_checkout_time / checkouts * 1000, 3) if checkouts else 0.0,
+                'max_checkout_ms': round(self._max_checkout_time * 1000, 3),
+            }
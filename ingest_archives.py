@@ -0,0 +1,141 @@
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from bulk_loader import create_connection
+from load_ledger import ensure_ledger_tables, file_fingerprint, is_file_loaded, record_archive
+from normalize_sources import process_stream, source_for_name
+from run_pipeline import INPUT_FOLDER, OUTPUT_FOLDER, get_worker_count
+
+# Settlement downloads arrive as zips, sometimes holding a (gzipped) tar of CSVs
+ARCHIVE_PATTERNS = ('*.zip', '*.tar', '*.tar.gz', '*.tgz')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+
+
+def find_archives(input_folder):
+    """Archives waiting in the input folder, in name order"""
+    archives = set()
+    for pattern in ARCHIVE_PATTERNS:
+        archives.update(Path(input_folder).glob(pattern))
+    return sorted(archives)
+
+
+def _iter_tar_members(tar):
+    for member in tar:
+        if member.isfile():
+            yield member.name, tar.extractfile(member)
+
+
+def iter_archive_members(archive_path):
+    """Yield (member name, binary stream) for every file in a zip or tar(.gz) archive.
+
+    Tars nested in a zip are read in stream mode from the zip member, so
+    nothing is extracted to disk. Each stream must be consumed before the
+    next member is requested.
+    """
+    archive_path = Path(archive_path)
+    if archive_path.name.lower().endswith(TAR_SUFFIXES):
+        with tarfile.open(archive_path, mode='r|*') as tar:
+            yield from _iter_tar_members(tar)
+        return
+
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with archive.open(info) as member:
+                if info.filename.lower().endswith(TAR_SUFFIXES):
+                    with tarfile.open(fileobj=member, mode='r|*') as tar:
+                        yield from _iter_tar_members(tar)
+                else:
+                    yield info.filename, member
+
+
+def ingest_archive(archive_path, output_folder):
+    """Process-pool task: load every settlement CSV in one archive, returns {source: rows}.
+
+    Members are routed to their source by file name. Archives already in the
+    load ledger are skipped without being opened.
+    """
+    archive_path = Path(archive_path)
+    connection = create_connection()
+    if not connection:
+        raise RuntimeError(f"Failed to connect to database for {archive_path.name}")
+
+    rows = {}
+    failed = []
+    try:
+        archive_hash = file_fingerprint(archive_path)
+        if is_file_loaded(connection, archive_hash):
+            print(f"⏭️ Archive {archive_path.name} already loaded, skipping")
+            return rows
+
+        members = 0
+        for name, stream in iter_archive_members(archive_path):
+            source = source_for_name(name)
+            if source is None:
+                print(f"ℹ️ {archive_path.name}: skipping {name}, it matches no source")
+                continue
+            loaded = process_stream(source, Path(name).name, stream, connection, output_folder)
+            if loaded is None:
+                failed.append(name)
+            else:
+                rows[source] = rows.get(source, 0) + loaded
+                members += 1
+
+        if not failed:
+            record_archive(connection, archive_hash, archive_path, members)
+    finally:
+        connection.close()
+
+    if failed:
+        raise RuntimeError(f"Loading {', '.join(failed)} from {archive_path.name} failed")
+    return rows
+
+
+def main():
+    """Load the settlement CSVs inside every archive in Input_Files, archives in parallel"""
+    OUTPUT_FOLDER.mkdir(exist_ok=True)
+    archives = find_archives(INPUT_FOLDER)
+    if not archives:
+        print(f"ℹ️ No archives found in {INPUT_FOLDER}")
+        return
+
+    connection = create_connection()
+    if not connection:
+        print("❌ Failed to connect to database")
+        sys.exit(1)
+    try:
+        ensure_ledger_tables(connection)
+    finally:
+        connection.close()
+
+    workers = min(get_worker_count(), len(archives))
+    print(f"🚀 Reading {len(archives)} archive(s) with {workers} workers...")
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(ingest_archive, str(archive_path), str(OUTPUT_FOLDER)): archive_path
+            for archive_path in archives
+        }
+        for future in as_completed(futures):
+            archive_path = futures[future]
+            try:
+                rows = future.result()
+                loaded = ', '.join(f"{source}: {count}" for source, count in rows.items()) or 'nothing new'
+                print(f"✅ {archive_path.name}: {loaded}")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {archive_path.name}: {e}")
+
+    print(f"Total wall time: {time.perf_counter() - start:.2f}s")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -45,11 +45,29 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import sys
+import time
 from dotenv import load_dotenv
+from load_ledger import ensure_ledger_tables
+from result_cache import mark_data_changed
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Tables cleared by a full reset
+RESET_TABLES = [
+    'payment_refund',
+    'paytm_phonepe',
+    'Recon_Outcome',
+    'load_ledger',
+    'recon_pending'
+]
+
+# delete   - DELETE FROM per table (slow, fully logged)
+# truncate - TRUNCATE TABLE per table (fast, tables are emptied one by one)
+RESET_MODES = ('delete', 'truncate')
+DEFAULT_RESET_MODE = 'truncate'
+
 def get_db_config():
     """Get database configuration from .env file"""
     return {
@@ -71,42 +89,64 @@ def create_connection():
         print(f"Error: {e}")
         return None
 
-def truncate_tables(connection):
-    """Truncate all reconciliation tables"""
+def get_reset_mode():
+    """Reset mode from the command line or .env (RESET_MODE), default truncate"""
+    mode = (sys.argv[1] if len(sys.argv) > 1 else os.getenv('RESET_MODE', DEFAULT_RESET_MODE)).lower()
+    if mode not in RESET_MODES:
+        print(f"⚠️ Unknown reset mode '{mode}', using {DEFAULT_RESET_MODE}")
+        mode = DEFAULT_RESET_MODE
+    return mode
+
+def delete_tables(connection, cursor, tables):
+    """Empty each table with DELETE FROM, one commit per table"""
+    for table in tables:
+        try:
+            cursor.execute(f"DELETE FROM {table}")
+            connection.commit()
+            print(f"✅ {table} table truncated successfully")
+        except Error as e:
+            print(f"❌ Error truncating {table}: {e}")
+            connection.rollback()
+
+def truncate_each_table(cursor, tables):
+    """Empty each table with TRUNCATE TABLE (drops and recreates the data files)"""
+    for table in tables:
+        try:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+            print(f"✅ {table} table truncated successfully")
+        except Error as e:
+            print(f"❌ Error truncating {table}: {e}")
+
+def truncate_tables(connection, mode=DEFAULT_RESET_MODE):
+    """Empty all reconciliation tables and the load ledger (full reset)"""
+    start = time.perf_counter()
     try:
         cursor = connection.cursor()
-
-        # List of tables to truncate
-        tables_to_truncate = [
-            'payment_refund',
-            'paytm_phonepe', 
-            'Recon_Outcome'
-        ]
-
-        for table in tables_to_truncate:
-            try:
-                cursor.execute(f"DELETE FROM {table}")
-                connection.commit()
-                print(f"✅ {table} table truncated successfully")
-            except Error as e:
-                print(f"❌ Error truncating {table}: {e}")
-                connection.rollback()
-
-        cursor.close()
+        try:
+            if mode == 'delete':
+                delete_tables(connection, cursor, RESET_TABLES)
+            else:
+                truncate_each_table(cursor, RESET_TABLES)
+        finally:
+            cursor.close()
+        mark_data_changed()
+        print(f"ℹ️ Reset ({mode}) took {time.perf_counter() - start:.2f}s")
 
     except Error as e:
         print(f"❌ Error in truncate operation: {e}")
 
 def main():
     """Main function to truncate database tables"""
-    print("🗑️ Starting database table truncation...")
+    mode = get_reset_mode()
+    print(f"🗑️ Starting database table truncation ({mode})...")
     
     # Create a MySQL connection
     connection = create_connection()
 
     if connection:
         try:
-            truncate_tables(connection)
+            ensure_ledger_tables(connection)
+            truncate_tables(connection, mode)
             print("✅ All table truncation operations completed!")
         finally:
             connection.close()  # Close the connection when done
@@ -0,0 +1,166 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pandas as pd
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+
+from bulk_loader import bulk_insert
+
+LEDGER_TABLE = 'load_ledger'
+PENDING_TABLE = 'recon_pending'
+# txn_source of ledger rows that stand for a whole archive; row_count holds its file count
+ARCHIVE_SOURCE = 'ARCHIVE'
+# Tables whose rows come from ledgered loads
+LOADED_TABLES = ('paytm_phonepe', 'payment_refund', 'Recon_Outcome')
+
+LEDGER_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+        content_hash CHAR(64) NOT NULL PRIMARY KEY,
+        file_name VARCHAR(255) NOT NULL,
+        txn_source VARCHAR(30) NOT NULL,
+        row_count INT NOT NULL,
+        loaded_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""",
+    f"""CREATE TABLE IF NOT EXISTS {PENDING_TABLE} (
+        id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        Txn_RefNo VARCHAR(60) NOT NULL,
+        INDEX idx_txn_refno (Txn_RefNo)
+    )""",
+]
+
+
+class FileAlreadyLoaded(Exception):
+    """The content was loaded already, e.g. by another worker that committed the same file first"""
+
+
+def _has_rows(cursor, table):
+    cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+    return cursor.fetchone() is not None
+
+
+def ensure_ledger_tables(connection):
+    """Create the load ledger and pending-recon tables if they do not exist.
+
+    While the ledger is empty, rows already in the loaded tables predate it:
+    the prepare step used to truncate and reload every input file on each
+    run. They are cleared here, otherwise the first incremental run after an
+    upgrade would load every file in Input_Files on top of them.
+    """
+    cursor = connection.cursor()
+    try:
+        for ddl in LEDGER_DDL:
+            cursor.execute(ddl)
+        if not _has_rows(cursor, LEDGER_TABLE):
+            for table in LOADED_TABLES:
+                if _has_rows(cursor, table):
+                    cursor.execute(f"TRUNCATE TABLE {table}")
+                    print(f"🧹 {table} held rows loaded before the load ledger existed, cleared for a full reload")
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def file_fingerprint(file_path, block_size=1024 * 1024):
+    """SHA-256 of the file content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """Binary stream wrapper that computes the SHA-256 of everything read through it.
+
+    Lets a file be parsed straight from an archive member and fingerprinted in
+    the same pass; the digest matches file_fingerprint() of the same content.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        self._digest.update(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def hexdigest(self, block_size=1024 * 1024):
+        """Digest of the whole stream, reading whatever the parser left unread"""
+        for block in iter(lambda: self._stream.read(block_size), b''):
+            self._digest.update(block)
+        return self._digest.hexdigest()
+
+
+def is_file_loaded(connection, content_hash):
+    """True if a file with this content was already loaded"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT 1 FROM {LEDGER_TABLE} WHERE content_hash = %s", (content_hash,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+
+def is_name_loaded(connection, file_name):
+    """True if a file with this name was loaded before, its content may still differ"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT 1 FROM {LEDGER_TABLE} WHERE file_name = %s LIMIT 1", (Path(file_name).name,))
+        return cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+
+def _insert_ledger_row(connection, content_hash, file_name, source, row_count):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"INSERT INTO {LEDGER_TABLE} (content_hash, file_name, txn_source, row_count) VALUES (%s, %s, %s, %s)",
+            (content_hash, Path(file_name).name, source, row_count)
+        )
+    except IntegrityError as e:
+        # Two workers loaded the same content and the other one committed first
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise FileAlreadyLoaded(content_hash) from e
+        raise
+    finally:
+        cursor.close()
+
+
+def queue_pending(connection, refnos):
+    """Queue Txn_RefNos for reconciliation inside the caller's transaction"""
+    refnos = refnos.dropna().drop_duplicates()
+    if len(refnos):
+        bulk_insert(connection, PENDING_TABLE, df=pd.DataFrame({'Txn_RefNo': refnos.to_numpy()}))
+
+
+def record_file(connection, content_hash, file_path, source, row_count):
+    """Add a ledger entry for a loaded file inside the caller's transaction.
+
+    Committed together with the loaded rows or not at all. Raises
+    FileAlreadyLoaded if the content is in the ledger already; the caller
+    rolls back.
+    """
+    _insert_ledger_row(connection, content_hash, file_path, source, row_count)
+
+
+def record_load(connection, content_hash, file_path, source, df):
+    """Add a ledger entry and queue the file's Txn_RefNos for reconciliation, see record_file()"""
+    record_file(connection, content_hash, file_path, source, len(df))
+    queue_pending(connection, df['Txn_RefNo'])
+
+
+def record_archive(connection, content_hash, archive_path, member_count):
+    """Add a ledger entry for a fully loaded archive so reruns skip it without opening it"""
+    try:
+        _insert_ledger_row(connection, content_hash, archive_path, ARCHIVE_SOURCE, member_count)
+        connection.commit()
+    except FileAlreadyLoaded:
+        connection.rollback()  # An identical archive was recorded by another worker
@@ -0,0 +1,507 @@
+import io
+import os
+import queue
+import sys
+import threading
+import time
+from decimal import Decimal
+from fnmatch import fnmatch
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from mysql.connector import Error
+
+from bulk_loader import ShardedInsert, bulk_insert, create_connection, get_load_workers
+from load_ledger import (FileAlreadyLoaded, HashingReader, ensure_ledger_tables, file_fingerprint, is_file_loaded,
+                         is_name_loaded, queue_pending, record_file, record_load)
+from pipeline_queue import put_until_stopped
+from result_cache import mark_data_changed
+
+# Columns of the unified normalized frame, in table order
+OUTPUT_COLUMNS = ['Txn_Source', 'Txn_Machine', 'Txn_MID', 'Txn_Type', 'Txn_Date', 'Txn_RefNo', 'Txn_Amount']
+# Column types of the normalized frame: the low-cardinality columns as categories and
+# the RefNo as text ('0012' or 'NA' must survive as-is); amounts are exact Decimals
+NORMALIZED_DTYPES = {
+    'Txn_Source': 'category',
+    'Txn_Type': 'category',
+    'Txn_RefNo': 'string',
+}
+
+# Raw rows parsed and normalized per batch when parsing and loading overlap, 0 parses whole files
+DEFAULT_PARSE_CHUNK_SIZE = 50000
+# Normalized batches the parser may get ahead of the loader
+QUEUE_BATCHES = 4
+
+
+def _strip_outer(values):
+    """Drop the first and last character (PayTM wraps every field in quotes)"""
+    return values.str.slice(1, -1)
+
+
+def _truncate_refno(refno):
+    """Cut the reference number at the first 'AZ', otherwise at the first '-'"""
+    has_az = refno.str.contains('AZ', regex=False)
+    return pd.Series(
+        np.where(has_az, refno.str.partition('AZ')[0], refno.str.partition('-')[0]),
+        index=refno.index
+    )
+
+
+def _iso_date(values, day, month, year):
+    """Build yyyy-mm-dd from fixed character offsets of a dd/mm/yyyy string"""
+    return values.str.slice(year, year + 4) + '-' + values.str.slice(month, month + 2) + '-' + values.str.slice(day, day + 2)
+
+
+def _decimal_amounts(values):
+    """Parse amount text into exact Decimals for the DECIMAL column, blanks become None"""
+    return values.str.strip().map(lambda value: Decimal(value) if value else None)
+
+
+def _negate(amounts):
+    return amounts.map(lambda value: -value, na_action='ignore')
+
+
+def _frame(source, machine, mid, txn_type, txn_date, refno, amount):
+    return pd.DataFrame({
+        'Txn_Source': source,
+        'Txn_Machine': machine,
+        'Txn_MID': mid,
+        'Txn_Type': txn_type,
+        'Txn_Date': txn_date,
+        'Txn_RefNo': refno,
+        'Txn_Amount': amount,
+    }, columns=OUTPUT_COLUMNS).astype(NORMALIZED_DTYPES)
+
+
+def normalize_paytm(df):
+    """Normalize a PayTM *bill_txn_report.csv frame"""
+    udf1 = df['udf1']
+    is_s12 = udf1.str.slice(1, 8) == 'S12_123'
+    machine = pd.Series(np.where(is_s12, 'S12_123', udf1.str.slice(-11, -1)), index=df.index)
+
+    # Type checks ignore case, like the PowerShell -eq they replace
+    txn_type = _strip_outer(df['transaction_type'])
+    txn_type = txn_type.mask(txn_type.str.upper() == 'ACQUIRING', 'PAYMENT')
+    amount = _decimal_amounts(_strip_outer(df['amount']))
+    # PayTM reports REFUND amounts as positive numbers
+    amount = amount.where(txn_type.str.upper() != 'REFUND', _negate(amount))
+
+    return _frame(
+        'PayTM',
+        machine,
+        _strip_outer(df['original_mid']),
+        txn_type,
+        _iso_date(df['transaction_date'], day=1, month=4, year=7),
+        _truncate_refno(_strip_outer(df['order_id'])),
+        amount,
+    )
+
+
+def normalize_phonepe(df):
+    """Normalize a PhonePe Merchant_Settlement_Report*.csv frame"""
+    payment_type = df['PaymentType']
+    is_payment = payment_type.str.upper() == 'PAYMENT'
+    is_refund = payment_type.str.upper() == 'REFUND'
+
+    # PAYMENT rows use the transaction itself, REFUND rows point at the original payment
+    txn_date = pd.Series(None, index=df.index, dtype=object)
+    txn_date[is_payment] = _iso_date(df.loc[is_payment, 'TransactionDate'], day=0, month=3, year=6)
+    txn_date[is_refund] = _iso_date(df.loc[is_refund, 'OriginalTransactionDate'], day=0, month=3, year=6)
+
+    refno = pd.Series(None, index=df.index, dtype=object)
+    refno[is_payment] = _truncate_refno(df.loc[is_payment, 'MerchantReferenceId'])
+    refno[is_refund] = _truncate_refno(df.loc[is_refund, 'OriginalMerchantReferenceId'])
+
+    # PhonePe already reports REFUND amounts as negative numbers
+    return _frame(
+        'PhonePe',
+        df['TerminalName'].str.slice(-10),
+        df['StoreId'].str.slice(0, 16),
+        payment_type,
+        txn_date,
+        refno,
+        _decimal_amounts(df['Amount']),
+    )
+
+
+def normalize_icloud_payment(df):
+    """Normalize an iCloud pmt*.csv frame (SUCCESS payments only)"""
+    df = df[df['Status'].str.contains('SUCCESS', case=False, regex=False)]
+    return _frame(
+        'iCLOUD-PAYMENT',
+        df['MachineId'],
+        df['MID'],
+        df['PaymentMethod'],
+        _iso_date(df['TransactionDate'], day=0, month=3, year=6),
+        df['TransactionId'],
+        _decimal_amounts(df['PaidAmount']),
+    )
+
+
+def normalize_icloud_refund(df):
+    """Normalize an iCloud ref*.csv frame (PENDING refunds only)"""
+    df = df[df['Status'].str.contains('PENDING', case=False, regex=False)]
+    return _frame(
+        'iCLOUD-REFUND',
+        df['MachineId'],
+        df['Remark'],
+        df['RefundPaymentMethod'] + ' (' + df['RefundType'] + ')',
+        _iso_date(df['TransactionDate'], day=0, month=3, year=6),
+        df['TransactionId'],
+        _negate(_decimal_amounts(df['RefundAmount'])),
+    )
+
+
+# Per-source input pattern, target table, normalizer and the header alias map:
+# canonical column the normalizer reads -> other spellings used in the downloads.
+# Only these columns are parsed, everything else in the file is skipped.
+SOURCES = {
+    'PayTM': {
+        'pattern': '*bill_txn_report.csv',
+        'table': 'paytm_phonepe',
+        'normalize': normalize_paytm,
+        'headers': {
+            'udf1': (),
+            'original_mid': (),
+            'transaction_type': (),
+            'transaction_date': (),
+            'order_id': (),
+            'amount': (),
+        },
+    },
+    'PhonePe': {
+        'pattern': 'Merchant_Settlement_Report*.csv',
+        'table': 'paytm_phonepe',
+        'normalize': normalize_phonepe,
+        'headers': {
+            'PaymentType': (),
+            'TerminalName': (),
+            'StoreId': (),
+            'Amount': (),
+            'TransactionDate': (),
+            'MerchantReferenceId': (),
+            'OriginalTransactionDate': (),
+            'OriginalMerchantReferenceId': (),
+        },
+    },
+    'iCloud_Payment': {
+        'pattern': 'pmt*.csv',
+        'table': 'payment_refund',
+        'normalize': normalize_icloud_payment,
+        'headers': {
+            'MachineId': ('Machine Id',),
+            'MID': (),
+            'PaymentMethod': ('Payment Method',),
+            'TransactionDate': ('Transaction Date',),
+            'TransactionId': ('Transaction Id',),
+            'PaidAmount': ('Paid Amount',),
+            'Status': (),
+        },
+    },
+    'iCloud_Refund': {
+        'pattern': 'ref*.csv',
+        'table': 'payment_refund',
+        'normalize': normalize_icloud_refund,
+        'headers': {
+            'MachineId': ('Machine Id',),
+            'Remark': (),
+            'RefundPaymentMethod': ('Refund Payment Method',),
+            'RefundType': ('Refund Type',),
+            'TransactionDate': ('Transaction Date',),
+            'TransactionId': ('Transaction Id',),
+            'RefundAmount': ('Refund Amount',),
+            'Status': (),
+        },
+    },
+}
+
+
+def _header_key(name):
+    return name.strip().casefold()
+
+
+def header_map(source):
+    """Lookup from a (case-insensitive) raw header to the source's canonical column name"""
+    lookup = {}
+    for column, aliases in SOURCES[source]['headers'].items():
+        for name in (column, *aliases):
+            lookup[_header_key(name)] = column
+    return lookup
+
+
+def _read_raw_csv(file_path, source, chunk_size=None):
+    lookup = header_map(source)
+    return pd.read_csv(
+        file_path, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+        usecols=lambda name: _header_key(name) in lookup, chunksize=chunk_size
+    ), lookup
+
+
+def _canonical_columns(df, source, lookup):
+    df.columns = [lookup[_header_key(name)] for name in df.columns]
+    missing = [column for column in SOURCES[source]['headers'] if column not in df.columns]
+    if missing:
+        raise ValueError(f"{source} file has no {', '.join(missing)} column(s)")
+    return df
+
+
+def read_source_csv(file_path, source):
+    """Read the columns a source needs from a raw settlement CSV, as text under canonical names.
+
+    Headers are renamed through the source's alias map while parsing, so the
+    file is read once and never rewritten on disk.
+    """
+    df, lookup = _read_raw_csv(file_path, source)
+    return _canonical_columns(df, source, lookup)
+
+
+def iter_normalized_batches(file_path, source, chunk_size):
+    """Yield the unified normalized frame of a raw settlement file, chunk_size raw rows at a time"""
+    reader, lookup = _read_raw_csv(file_path, source, chunk_size)
+    with reader:
+        for df in reader:
+            df = _canonical_columns(df, source, lookup)
+            if len(df):
+                yield SOURCES[source]['normalize'](df)
+
+
+def find_source_files(source, input_folder):
+    """Input files of one source, in name order"""
+    return sorted(Path(input_folder).glob(SOURCES[source]['pattern']))
+
+
+def source_for_name(file_name):
+    """Source whose input pattern matches a file name (case-insensitive), None if no source does"""
+    name = Path(file_name).name.lower()
+    for source, spec in SOURCES.items():
+        if fnmatch(name, spec['pattern'].lower()):
+            return source
+    return None
+
+
+def process_file(source, file_path, connection, output_folder):
+    """Normalize and load one input file, returns rows loaded, 0 if already loaded, or None on a database error.
+
+    A new file is read once, it is fingerprinted while being parsed. Only a
+    file whose name is already in the load ledger (a rerun over the same
+    folder) is hashed up front, so unchanged reports are skipped unparsed.
+    """
+    file_path = Path(file_path)
+    if is_name_loaded(connection, file_path.name) and is_file_loaded(connection, file_fingerprint(file_path)):
+        print(f"⏭️ {source} file {file_path.name} already loaded, skipping")
+        return 0
+
+    with open(file_path, 'rb') as stream:
+        return process_stream(source, file_path.name, stream, connection, output_folder)
+
+
+def process_stream(source, file_name, stream, connection, output_folder):
+    """Normalize and load one settlement file from a binary stream, e.g. an archive member.
+
+    The content is parsed and fingerprinted in the same pass, nothing is
+    written to disk before loading. With PARSE_CHUNK_SIZE > 0 parsing and
+    loading overlap (see load_pipelined). Returns rows loaded, 0 if the
+    content was already loaded, or None on a database error.
+    """
+    chunk_size = get_parse_chunk_size()
+    if chunk_size:
+        return load_pipelined(source, file_name, stream, connection, output_folder, chunk_size)
+
+    print(f"📄 Processing {source} file: {file_name}")
+    start = time.perf_counter()
+    reader = HashingReader(stream)
+    df = SOURCES[source]['normalize'](read_source_csv(io.BufferedReader(reader), source))
+    content_hash = reader.hexdigest()
+    if is_file_loaded(connection, content_hash):
+        print(f"⏭️ {source} file {file_name} already loaded, skipping")
+        return 0
+
+    print(f"🔄 {len(df)} rows normalized in {time.perf_counter() - start:.2f}s")
+    return load_normalized(source, file_name, df, content_hash, connection, output_folder)
+
+
+def load_normalized(source, file_name, df, content_hash, connection, output_folder):
+    """Insert a normalized frame and its ledger entry in one transaction, returns rows loaded or None.
+
+    The normalized output is written first, so LOAD_STRATEGY=infile loads
+    straight from it; it only keeps its final name once the load commits.
+    """
+    output_file = Path(output_folder) / Path(file_name).name
+    partial_file = output_file.with_name(output_file.name + '.part')
+    df.to_csv(partial_file, index=False)
+    try:
+        inserted = bulk_insert(connection, SOURCES[source]['table'], df=df, csv_file_path=partial_file)
+        record_load(connection, content_hash, file_name, source, df)
+        connection.commit()
+        mark_data_changed()
+    except FileAlreadyLoaded:
+        connection.rollback()
+        partial_file.unlink(missing_ok=True)
+        print(f"⏭️ {source} file {file_name} was loaded by another worker, skipping")
+        return 0
+    except Error as e:
+        print(f"Error: {e}")
+        connection.rollback()  # Rollback in case of error
+        partial_file.unlink(missing_ok=True)
+        return None
+
+    # Keep the normalized output next to the other processed files
+    partial_file.replace(output_file)
+    return inserted
+
+
+def get_parse_chunk_size():
+    """Raw rows per pipelined batch from .env (PARSE_CHUNK_SIZE), 0 turns pipelining off"""
+    try:
+        return max(int(os.getenv('PARSE_CHUNK_SIZE', DEFAULT_PARSE_CHUNK_SIZE)), 0)
+    except ValueError:
+        return DEFAULT_PARSE_CHUNK_SIZE
+
+
+def parse_batches(source, stream, chunk_size, batches, stop):
+    """Parser thread: queue ('rows', frame) per normalized batch, then ('done', content hash) or ('error', exception)"""
+    try:
+        reader = HashingReader(stream)
+        for df in iter_normalized_batches(io.BufferedReader(reader), source, chunk_size):
+            if not put_until_stopped(batches, ('rows', df), stop):
+                return
+        put_until_stopped(batches, ('done', reader.hexdigest()), stop)
+    except Exception as e:
+        put_until_stopped(batches, ('error', e), stop)
+
+
+def load_pipelined(source, file_name, stream, connection, output_folder, chunk_size):
+    """Parse and load one settlement file at the same time, returns rows loaded, 0 if already loaded, or None on a database error.
+
+    A parser thread normalizes chunk_size raw rows at a time from the binary
+    stream onto a bounded queue while this thread inserts each batch as it
+    arrives, so the file takes about as long as the slower of the two and
+    only a few batches are in memory at once. Each batch's Txn_RefNos are
+    queued for reconciliation as the batch is inserted. The content is
+    fingerprinted while parsing; all batches and the ledger entry share one
+    transaction, which is rolled back if the content turns out to be loaded
+    already.
+
+    With LOAD_WORKERS > 1 every batch is sharded by Txn_RefNo over that many
+    pooled connections (see bulk_loader.ShardedInsert). The ledger row is
+    inserted on this connection before the shards commit, so a racing
+    duplicate is still caught with nothing committed, and committed after
+    them. A crash between those commits leaves rows without a ledger entry.
+    """
+    file_name = Path(file_name).name
+    output_file = Path(output_folder) / file_name
+    partial_file = output_file.with_name(output_file.name + '.part')
+    print(f"📄 Processing {source} file: {file_name} (pipelined, {chunk_size} rows per batch)")
+
+    stop = threading.Event()
+    batches = queue.Queue(maxsize=QUEUE_BATCHES)
+    parser = threading.Thread(target=parse_batches, args=(source, stream, chunk_size, batches, stop), daemon=True)
+    start = time.perf_counter()
+    waited = 0.0
+    inserted = 0
+    workers = get_load_workers()
+    shards = None
+
+    def rollback():
+        connection.rollback()  # Rollback in case of error
+        if shards is not None:
+            shards.rollback()
+        partial_file.unlink(missing_ok=True)
+
+    parser.start()
+    try:
+        if workers > 1:
+            shards = ShardedInsert(SOURCES[source]['table'], workers)
+        while True:
+            wait_start = time.perf_counter()
+            kind, df = batches.get()
+            waited += time.perf_counter() - wait_start
+            if kind == 'error':
+                raise df
+            if kind == 'done':
+                content_hash = df
+                break
+            df.to_csv(partial_file, mode='a' if inserted else 'w', header=not inserted, index=False)
+            if shards is not None:
+                inserted += shards.insert(df)
+            else:
+                inserted += bulk_insert(connection, SOURCES[source]['table'], df=df)
+            queue_pending(connection, df['Txn_RefNo'])
+
+        if is_file_loaded(connection, content_hash):
+            raise FileAlreadyLoaded(content_hash)
+        record_file(connection, content_hash, file_name, source, inserted)
+        if shards is not None:
+            shards.commit()
+        connection.commit()
+        mark_data_changed()
+    except FileAlreadyLoaded:
+        rollback()
+        print(f"⏭️ {source} file {file_name} already loaded, skipping")
+        return 0
+    except Error as e:
+        print(f"Error: {e}")
+        rollback()
+        return None
+    except Exception:
+        rollback()
+        raise
+    finally:
+        stop.set()
+        parser.join()
+        if shards is not None:
+            shards.close()
+
+    # Keep the normalized output next to the other processed files
+    if partial_file.exists():
+        partial_file.replace(output_file)
+    else:
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(output_file, index=False)
+    elapsed = time.perf_counter() - start
+    if shards is not None:
+        shards.report(elapsed - waited)
+    print(f"🔄 {inserted} rows parsed and loaded in {elapsed:.2f}s "
+          f"(loading {elapsed - waited:.2f}s, waiting on the parser {waited:.2f}s)")
+    return inserted
+
+
+def process_source(source, connection, input_folder, output_folder):
+    """Normalize and load every input file of one source, returns rows loaded"""
+    files = find_source_files(source, input_folder)
+    if not files:
+        print(f"ℹ️ No {source} files found in {input_folder}")
+        return 0
+
+    return sum(process_file(source, file_path, connection, output_folder) or 0 for file_path in files)
+
+
+def main():
+    """Normalize and load the sources named on the command line (default: all)"""
+    BASE_DIR = Path(__file__).parent.resolve()
+    INPUT_FOLDER = BASE_DIR / 'Input_Files'
+    OUTPUT_FOLDER = BASE_DIR / 'Output_Files'
+    OUTPUT_FOLDER.mkdir(exist_ok=True)
+
+    sources = sys.argv[1:] or list(SOURCES)
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        print(f"❌ Unknown source(s): {', '.join(unknown)}. Available: {', '.join(SOURCES)}")
+        sys.exit(1)
+
+    connection = create_connection()
+    if not connection:
+        print("❌ Failed to connect to database")
+        sys.exit(1)
+
+    try:
+        ensure_ledger_tables(connection)
+        for source in sources:
+            rows = process_source(source, connection, INPUT_FOLDER, OUTPUT_FOLDER)
+            print(f"✅ {source}: {rows} rows loaded")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
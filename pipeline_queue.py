@@ -0,0 +1,16 @@
+import queue
+
+
+def put_until_stopped(items, item, stop, timeout=0.5):
+    """Put item on a bounded queue, waiting while it is full.
+
+    Returns True once queued, or False if stop was set first, e.g. because the
+    consumer failed and will never take another item.
+    """
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            pass
+    return False
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+from bulk_loader import bulk_insert
+from load_ledger import PENDING_TABLE
+from result_cache import mark_data_changed
+
+# Columns of the Recon_Outcome table, in table order
+OUTCOME_COLUMNS = [
+    'Txn_RefNo', 'Txn_Machine', 'Txn_MID',
+    'PTPP_Payment', 'PTPP_Refund', 'Cloud_Payment', 'Cloud_Refund', 'Cloud_MRefund',
+    'delta', 'status', 'is_manual', 'Txn_Date'
+]
+AMOUNT_COLUMNS = OUTCOME_COLUMNS[3:8]
+
+PTPP_SOURCES = ('PayTM', 'PhonePe')
+MANUAL_MARKER = 'manual'
+
+# Which row wins when a Txn_RefNo has several machine/MID values (lower wins).
+# Manual refunds come first so their remark ends up in Txn_MID for the MANUAL_REFUND sheet.
+_PRIORITY_MANUAL_REFUND = 0
+_PRIORITY_CLOUD_PAYMENT = 1
+_PRIORITY_CLOUD_REFUND = 2
+_PRIORITY_PTPP = 3
+
+
+def _bucket_rows(transactions):
+    """Assign every normalized transaction to its Recon_Outcome amount column"""
+    source = transactions['Txn_Source'].astype(str)
+    txn_type = transactions['Txn_Type'].astype(str).str.upper()
+    is_manual = transactions['Txn_MID'].astype(str).str.contains(MANUAL_MARKER, case=False, regex=False)
+
+    is_ptpp = source.isin(PTPP_SOURCES)
+    is_cloud_payment = source == 'iCLOUD-PAYMENT'
+    is_cloud_refund = source == 'iCLOUD-REFUND'
+
+    bucket = np.select(
+        [
+            is_ptpp & (txn_type == 'PAYMENT'),
+            is_ptpp & (txn_type == 'REFUND'),
+            is_cloud_payment,
+            is_cloud_refund & is_manual,
+            is_cloud_refund,
+        ],
+        ['PTPP_Payment', 'PTPP_Refund', 'Cloud_Payment', 'Cloud_MRefund', 'Cloud_Refund'],
+        default=''
+    )
+    priority = np.select(
+        [is_cloud_refund & is_manual, is_cloud_payment, is_cloud_refund, is_ptpp],
+        [_PRIORITY_MANUAL_REFUND, _PRIORITY_CLOUD_PAYMENT, _PRIORITY_CLOUD_REFUND, _PRIORITY_PTPP],
+        default=_PRIORITY_PTPP + 1
+    )
+    return bucket, priority
+
+
+def build_recon_outcome(transactions):
+    """Build the Recon_Outcome table from normalized transactions.
+
+    `transactions` holds PayTM/PhonePe and iCloud payment/refund rows in the
+    unified Txn_Source..Txn_Amount layout. Amounts are summed per Txn_RefNo
+    with a hash group-by, so the cost grows linearly with the row count.
+    """
+    transactions = transactions[transactions['Txn_RefNo'].notna()]
+    bucket, priority = _bucket_rows(transactions)
+
+    frame = pd.DataFrame({
+        'Txn_RefNo': transactions['Txn_RefNo'].astype(str).str.strip().to_numpy(),
+        'Txn_Machine': transactions['Txn_Machine'].to_numpy(),
+        'Txn_MID': transactions['Txn_MID'].to_numpy(),
+        'Bucket': bucket,
+        'Priority': priority,
+        'Txn_Amount': pd.to_numeric(transactions['Txn_Amount'], errors='coerce').fillna(0).to_numpy(dtype=float),
+        'Txn_Date': pd.to_datetime(transactions['Txn_Date'], errors='coerce').to_numpy(),
+    })
+    frame = frame[frame['Bucket'] != '']
+    if frame.empty:
+        # Empty tables, or only rows no amount column takes
+        return pd.DataFrame(columns=OUTCOME_COLUMNS)
+
+    amounts = (
+        frame.groupby(['Txn_RefNo', 'Bucket'], sort=False)['Txn_Amount'].sum()
+        .unstack(fill_value=0.0)
+        .reindex(columns=AMOUNT_COLUMNS, fill_value=0.0)
+    )
+
+    # Take machine/MID from the highest priority row of each Txn_RefNo
+    identity = None
+    for level in sorted(frame['Priority'].unique()):
+        firsts = frame[frame['Priority'] == level].groupby('Txn_RefNo', sort=False)[['Txn_Machine', 'Txn_MID']].first()
+        identity = firsts if identity is None else identity.combine_first(firsts)
+
+    # A Txn_RefNo is dated by its earliest transaction, which keeps a payment and
+    # its later refund in the same Recon_Outcome partition
+    txn_date = frame.groupby('Txn_RefNo', sort=False)['Txn_Date'].min().dt.date
+
+    outcome = amounts.join(identity, how='left').join(txn_date, how='left').reset_index()
+    outcome[AMOUNT_COLUMNS] = outcome[AMOUNT_COLUMNS].round(2)
+
+    # Materialize the sheet classification so the report queries need no arithmetic or subqueries
+    outcome['delta'] = outcome_delta(outcome)
+    outcome['status'] = classify_outcome(outcome)
+    outcome['is_manual'] = is_manual_outcome(outcome).astype(int)
+    return outcome[OUTCOME_COLUMNS]
+
+
+def outcome_delta(outcome):
+    """PayTM/PhonePe total minus iCloud total for every outcome row"""
+    ptpp = outcome['PTPP_Payment'] + outcome['PTPP_Refund']
+    cloud = outcome['Cloud_Payment'] + outcome['Cloud_Refund'] + outcome['Cloud_MRefund']
+    return (ptpp - cloud).round(2)
+
+
+def classify_outcome(outcome):
+    """Return the Perfect/Investigate remark for every outcome row"""
+    return pd.Series(
+        np.where(np.isclose(outcome_delta(outcome), 0), 'Perfect', 'Investigate'),
+        index=outcome.index
+    )
+
+
+def is_manual_outcome(outcome):
+    """Flag outcome rows that belong on the MANUAL_REFUND sheet"""
+    return outcome['Txn_MID'].fillna('').astype(str).str.contains(MANUAL_MARKER, case=False, regex=False)
+
+
+TRANSACTION_TABLES = ('paytm_phonepe', 'payment_refund')
+TRANSACTION_COLUMNS = 'Txn_Source, Txn_Machine, Txn_MID, Txn_Type, Txn_Date, Txn_RefNo, Txn_Amount'
+
+
+def _execute(connection, sql, params=None):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if cursor.with_rows else None
+    finally:
+        cursor.close()
+
+
+def last_pending_id(connection):
+    """Highest recon_pending id right now, None if nothing is queued"""
+    return _execute(connection, f"SELECT MAX(id) FROM {PENDING_TABLE}")[0][0]
+
+
+def load_transactions(connection):
+    """Read the normalized transactions from paytm_phonepe and payment_refund"""
+    frames = [
+        pd.read_sql(f"SELECT {TRANSACTION_COLUMNS} FROM {table}", connection)
+        for table in TRANSACTION_TABLES
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_pending_transactions(connection, last_id):
+    """Read every transaction of the Txn_RefNos queued in recon_pending up to last_id"""
+    columns = ', '.join(f"t.{c.strip()}" for c in TRANSACTION_COLUMNS.split(','))
+    frames = [
+        pd.read_sql(
+            f"SELECT {columns} FROM {table} t "
+            f"JOIN (SELECT DISTINCT Txn_RefNo FROM {PENDING_TABLE} WHERE id <= %s) p ON p.Txn_RefNo = t.Txn_RefNo",
+            connection,
+            params=(last_id,)
+        )
+        for table in TRANSACTION_TABLES
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_recon_outcome(connection, outcome, last_id=None):
+    """Replace the contents of Recon_Outcome with `outcome` in one transaction"""
+    _execute(connection, "DELETE FROM Recon_Outcome")
+    inserted = bulk_insert(connection, 'Recon_Outcome', df=outcome[OUTCOME_COLUMNS])
+    if last_id is not None:
+        _execute(connection, f"DELETE FROM {PENDING_TABLE} WHERE id <= %s", (last_id,))
+    connection.commit()
+    mark_data_changed()
+    return inserted
+
+
+def refresh_pending_outcome(connection):
+    """Recompute Recon_Outcome only for the Txn_RefNos queued by new loads.
+
+    Returns the outcome rows written, or None when nothing was queued. Rows
+    queued while this runs are left for the next call.
+    """
+    last_id = last_pending_id(connection)
+    if last_id is None:
+        return None
+
+    outcome = build_recon_outcome(load_pending_transactions(connection, last_id))
+    pending = f"(SELECT DISTINCT Txn_RefNo FROM {PENDING_TABLE} WHERE id <= %s)"
+    _execute(connection, f"DELETE ro FROM Recon_Outcome ro JOIN {pending} p ON p.Txn_RefNo = ro.Txn_RefNo", (last_id,))
+    bulk_insert(connection, 'Recon_Outcome', df=outcome[OUTCOME_COLUMNS])
+    _execute(connection, f"DELETE FROM {PENDING_TABLE} WHERE id <= %s", (last_id,))
+    connection.commit()
+    mark_data_changed()
+    return outcome
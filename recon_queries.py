@@ -0,0 +1,187 @@
+# Sheet queries shared by the API (app.py) and the Excel report (Generate_Recon_Output.py).
+# The recon sheets read the status/is_manual columns that recon_engine stores on
+# Recon_Outcome, so each one is an indexed range scan on idx_recon_class.
+#
+# build_sheet_query() adds an optional Txn_Date range inside every table scan, so
+# MySQL prunes the monthly partitions created by schema_manager.py.
+
+RECON_COLUMNS = """
+        ro.Txn_RefNo, ro.Txn_Machine, ro.Txn_MID,
+        ro.PTPP_Payment, ro.PTPP_Refund, ro.Cloud_Payment, ro.Cloud_Refund, ro.Cloud_MRefund,
+        ro.status AS Remarks
+"""
+
+RECON_SHEET_FILTERS = {
+    'RECON_SUCCESS': "ro.is_manual = 0 AND ro.status = 'Perfect'",
+    'RECON_INVESTIGATE': "ro.is_manual = 0 AND ro.status = 'Investigate'",
+    'MANUAL_REFUND': "ro.is_manual = 1",
+}
+
+SHEETS = ['SUMMARY', 'RAWDATA', *RECON_SHEET_FILTERS]
+
+# Recon_Outcome.status -> sheet, for rows that are not manual refunds
+RECON_STATUS_SHEETS = {'Perfect': 'RECON_SUCCESS', 'Investigate': 'RECON_INVESTIGATE'}
+
+
+def date_range_condition(column, date_from=None, date_to=None):
+    """SQL condition and params limiting column to [date_from, date_to], '' if unbounded"""
+    conditions = []
+    params = []
+    if date_from is not None:
+        conditions.append(f"{column} >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append(f"{column} <= %s")
+        params.append(date_to)
+    return ' AND '.join(conditions), params
+
+
+def build_sheet_query(sheet, date_from=None, date_to=None):
+    """Return (query, params) for a sheet, optionally limited to a Txn_Date range"""
+    if sheet == 'SUMMARY':
+        pr_where, pr_params = _where('pr', date_from, date_to)
+        pp_where, pp_params = _where('pp', date_from, date_to)
+        query = f"""
+        (SELECT txn_source, Txn_type, sum(Txn_Amount) FROM reconciliation.payment_refund pr{pr_where} GROUP BY 1, 2)
+        UNION
+        (SELECT Txn_Source, Txn_type, sum(Txn_Amount) FROM reconciliation.paytm_phonepe pp{pp_where} GROUP BY 1, 2)
+    """
+        return query, pr_params + pp_params
+
+    if sheet == 'RAWDATA':
+        pp_where, pp_params = _where('pp', date_from, date_to)
+        pr_where, pr_params = _where('pr', date_from, date_to)
+        query = f"""
+        (SELECT * FROM reconciliation.paytm_phonepe pp{pp_where})
+        UNION ALL
+        (SELECT * FROM reconciliation.payment_refund pr{pr_where})
+    """
+        return query, pp_params + pr_params
+
+    condition, params = date_range_condition('ro.Txn_Date', date_from, date_to)
+    query = f"""
+        SELECT {RECON_COLUMNS}
+        FROM reconciliation.recon_outcome ro
+        WHERE {RECON_SHEET_FILTERS[sheet]}{' AND ' + condition if condition else ''}
+        ORDER BY ro.Txn_RefNo
+    """
+    return query, params
+
+
+def build_recon_outcome_query(date_from=None, date_to=None):
+    """Return (query, params) reading all three recon sheets in one pass over Recon_Outcome.
+
+    Rows carry the sheet columns plus is_manual; route them with recon_sheet_name().
+    Within each sheet they keep the Txn_RefNo order of the per-sheet queries.
+    """
+    condition, params = date_range_condition('ro.Txn_Date', date_from, date_to)
+    query = f"""
+        SELECT {RECON_COLUMNS.rstrip()}, ro.is_manual
+        FROM reconciliation.recon_outcome ro{' WHERE ' + condition if condition else ''}
+        ORDER BY ro.Txn_RefNo
+    """
+    return query, params
+
+
+def build_recon_counts_query(date_from=None, date_to=None):
+    """Return (query, params) counting Recon_Outcome rows per (is_manual, status), an idx_recon_class scan"""
+    condition, params = date_range_condition('ro.Txn_Date', date_from, date_to)
+    query = f"""
+        SELECT ro.is_manual, ro.status, COUNT(*) AS row_count
+        FROM reconciliation.recon_outcome ro{' WHERE ' + condition if condition else ''}
+        GROUP BY ro.is_manual, ro.status
+    """
+    return query, params
+
+
+def recon_sheet_name(is_manual, remarks):
+    """Sheet a Recon_Outcome row belongs on, None if it is on none of them"""
+    if is_manual:
+        return 'MANUAL_REFUND'
+    return RECON_STATUS_SHEETS.get(remarks)
+
+
+def build_summary_stats_query(date_from=None, date_to=None):
+    """Return (query, params) for RAWDATA counts and amounts per source/type WITH ROLLUP.
+
+    Each table is grouped on its own first, so the rollup only combines a
+    handful of rows. GROUPING() flags the subtotal and grand total rows.
+    """
+    pp_where, pp_params = _where('pp', date_from, date_to)
+    pr_where, pr_params = _where('pr', date_from, date_to)
+    query = f"""
+        SELECT Txn_Source, Txn_Type,
+               SUM(txn_count) AS txn_count, SUM(amount) AS amount,
+               GROUPING(Txn_Source) AS all_sources, GROUPING(Txn_Type) AS all_types
+        FROM (
+            SELECT Txn_Source, Txn_Type, COUNT(*) AS txn_count, SUM(Txn_Amount) AS amount
+            FROM reconciliation.paytm_phonepe pp{pp_where} GROUP BY Txn_Source, Txn_Type
+            UNION ALL
+            SELECT Txn_Source, Txn_Type, COUNT(*) AS txn_count, SUM(Txn_Amount) AS amount
+            FROM reconciliation.payment_refund pr{pr_where} GROUP BY Txn_Source, Txn_Type
+        ) grouped
+        GROUP BY Txn_Source, Txn_Type WITH ROLLUP
+    """
+    return query, pp_params + pr_params
+
+
+TRANSACTION_FINGERPRINT_COLUMNS = ['Txn_Source', 'Txn_Machine', 'Txn_MID', 'Txn_Type', 'Txn_Date', 'Txn_RefNo', 'Txn_Amount']
+RECON_FINGERPRINT_COLUMNS = [
+    'Txn_RefNo', 'Txn_Machine', 'Txn_MID',
+    'PTPP_Payment', 'PTPP_Refund', 'Cloud_Payment', 'Cloud_Refund', 'Cloud_MRefund', 'status'
+]
+
+# Distinct transaction dates, for the per-day report files
+REPORT_DAYS_QUERY = """
+    SELECT Txn_Date FROM reconciliation.paytm_phonepe WHERE Txn_Date IS NOT NULL
+    UNION
+    SELECT Txn_Date FROM reconciliation.payment_refund WHERE Txn_Date IS NOT NULL
+    ORDER BY Txn_Date
+"""
+
+
+def _row_checksum(alias, columns):
+    # QUOTE() keeps NULL and '' apart; SUM (not BIT_XOR) so duplicate rows still count
+    quoted = ', '.join(f"QUOTE({alias}.{column})" for column in columns)
+    return f"COALESCE(SUM(CRC32(CONCAT_WS('|', {quoted}))), 0)"
+
+
+def build_fingerprint_query(sheet, date_from=None, date_to=None, per_day=False):
+    """Return (query, params) giving (row_count, checksum) of the data behind a sheet.
+
+    The checksum does not depend on row order, so it only changes when the
+    rows behind the sheet change. SUMMARY and RAWDATA share the transaction
+    tables' fingerprint, so both get the same query text. With per_day the
+    rows are (Txn_Date, row_count, checksum), one per day, from a single pass.
+    """
+    day_column = 'Txn_Date, ' if per_day else ''
+    group_by = ' GROUP BY Txn_Date' if per_day else ''
+    if sheet in ('SUMMARY', 'RAWDATA'):
+        pp_where, pp_params = _where('pp', date_from, date_to)
+        pr_where, pr_params = _where('pr', date_from, date_to)
+        query = f"""
+        SELECT {day_column}SUM(row_count) AS row_count, SUM(checksum) AS checksum FROM (
+            SELECT {day_column}COUNT(*) AS row_count, {_row_checksum('pp', TRANSACTION_FINGERPRINT_COLUMNS)} AS checksum
+            FROM reconciliation.paytm_phonepe pp{pp_where}{group_by}
+            UNION ALL
+            SELECT {day_column}COUNT(*) AS row_count, {_row_checksum('pr', TRANSACTION_FINGERPRINT_COLUMNS)} AS checksum
+            FROM reconciliation.payment_refund pr{pr_where}{group_by}
+        ) fingerprints{group_by}
+    """
+        return query, pp_params + pr_params
+
+    condition, params = date_range_condition('ro.Txn_Date', date_from, date_to)
+    query = f"""
+        SELECT {day_column}COUNT(*) AS row_count, {_row_checksum('ro', RECON_FINGERPRINT_COLUMNS)} AS checksum
+        FROM reconciliation.recon_outcome ro
+        WHERE {RECON_SHEET_FILTERS[sheet]}{' AND ' + condition if condition else ''}{group_by}
+    """
+    return query, params
+
+
+def _where(alias, date_from, date_to):
+    condition, params = date_range_condition(f"{alias}.Txn_Date", date_from, date_to)
+    return (f" WHERE {condition}" if condition else ''), params
+
+
+QUERIES = {sheet: build_sheet_query(sheet)[0] for sheet in SHEETS}
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Touched by every script that changes the reconciliation tables, so a
+# long-running API process notices loads and truncates done by the batch files
+DATA_GENERATION_FILE = Path(__file__).parent.resolve() / 'Output_Files' / '.data_generation'
+
+
+def mark_data_changed(path=DATA_GENERATION_FILE):
+    """Record that the reconciliation tables changed"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(str(time.time()))
+
+
+def read_data_generation(path=DATA_GENERATION_FILE):
+    """Current data-load generation, 0 if nothing was loaded yet"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+class ResultCache:
+    """Size-bounded LRU cache for query results keyed on the data-load generation.
+
+    Entries are dropped when the generation marker changes or invalidate() is
+    called. Eviction keeps both the entry count and the total cached rows
+    under their limits.
+    """
+
+    def __init__(self, max_entries=64, max_rows=500000, generation_file=DATA_GENERATION_FILE):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.generation_file = generation_file
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (rows, value)
+        self._rows = 0
+        self._generation = read_data_generation(generation_file)
+        self._local_generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_generation(self):
+        generation = read_data_generation(self.generation_file)
+        if generation != self._generation:
+            self._generation = generation
+            self._clear()
+
+    def _clear(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+        self._rows = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            self._check_generation()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self):
+        """Token for the data a query started now will read, see put()"""
+        with self._lock:
+            self._check_generation()
+            return self._generation, self._local_generation
+
+    def put(self, key, value, rows=1, generation=None):
+        """Cache value for key, results larger than max_rows are not kept.
+
+        Pass the generation() taken before the query ran: if a load or an
+        invalidate() happened while it was running the value may be stale
+        and is not cached.
+        """
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            self._check_generation()
+            if generation is not None and generation != (self._generation, self._local_generation):
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= old[0]
+            self._entries[key] = (rows, value)
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                _, (evicted_rows, _) = self._entries.popitem(last=False)
+                self._rows -= evicted_rows
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry, e.g. after a processing run completed"""
+        with self._lock:
+            self._local_generation += 1
+            self._clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'rows': self._rows,
+                'max_entries': self.max_entries,
+                'max_rows': self.max_rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'generation': f"{self._generation}.{self._local_generation}",
+            }
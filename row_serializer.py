@@ -0,0 +1,99 @@
+from datetime import datetime
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+from mysql.connector import FieldFlag, FieldType
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard json module
+    orjson = None
+
+# Same values as converting each cell separately and then running Flask's default
+# encoder, but the converter is chosen once per column from cursor.description.
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+DATETIME_TYPES = {FieldType.DATETIME, FieldType.TIMESTAMP}
+DATE_TYPES = {FieldType.DATE, FieldType.NEWDATE}
+BLOB_TYPES = {FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB, FieldType.BLOB}
+STRING_TYPES = {FieldType.VAR_STRING, FieldType.STRING, FieldType.VARCHAR}
+
+
+# A sheet holds few distinct dates, so formatting each one once saves most of the cost
+_http_date = lru_cache(maxsize=4096)(http_date)
+
+
+def decode_bytes(value):
+    return value.decode('utf-8', errors='ignore') if isinstance(value, (bytes, bytearray)) else value
+
+
+def is_bytes_column(column):
+    """BLOB/TEXT and BINARY string columns may come back as bytes"""
+    flags = column[7] if len(column) > 7 else 0
+    return column[1] in BLOB_TYPES or (column[1] in STRING_TYPES and flags & FieldFlag.BINARY)
+
+
+def column_converter(column):
+    """Converter for one cursor.description entry, None if values pass through as-is"""
+    type_code = column[1]
+    if type_code in DECIMAL_TYPES:
+        return float
+    if type_code in DATETIME_TYPES:
+        return datetime.isoformat
+    if type_code in DATE_TYPES:
+        return _http_date
+    if is_bytes_column(column):
+        return decode_bytes
+    return None
+
+
+def rows_to_dicts(description, rows):
+    """Convert tuple rows into JSON-ready dicts, converting column by column"""
+    if not rows:
+        return []
+    names = [column[0] for column in description]
+    converters = [column_converter(column) for column in description]
+    if not any(converters):
+        return [dict(zip(names, row)) for row in rows]
+
+    columns = list(zip(*rows))
+    for index, convert in enumerate(converters):
+        if convert is not None:
+            columns[index] = [None if value is None else convert(value) for value in columns[index]]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Types orjson does not handle natively (Decimal, and dates, which Flask
+    renders as HTTP dates) go through Flask's default hook, and keys are
+    sorted like the standard provider does, so the JSON carries the same
+    values in the same order. Unlike ensure_ascii, non-ASCII text is written
+    as UTF-8 rather than \\u escapes. Options orjson cannot express fall back
+    to the standard encoder.
+    """
+
+    def _orjson_option(self, kwargs):
+        """orjson option flags for json.dumps-style kwargs, None if some kwarg has no equivalent"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        for name, value in kwargs.items():
+            if name == 'indent' and value == 2:
+                option |= orjson.OPT_INDENT_2
+            elif name == 'separators' and tuple(value) == (',', ':'):
+                pass  # orjson output is always compact
+            elif name == 'sort_keys':
+                pass
+            elif name == 'default' and value is self.default:
+                pass
+            elif value is not None:
+                return None
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        option = None if orjson is None else self._orjson_option(kwargs)
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
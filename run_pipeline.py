@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from bulk_loader import create_connection
+from load_ledger import ensure_ledger_tables
+from normalize_sources import SOURCES, find_source_files, process_file
+
+BASE_DIR = Path(__file__).parent.resolve()
+INPUT_FOLDER = BASE_DIR / 'Input_Files'
+OUTPUT_FOLDER = BASE_DIR / 'Output_Files'
+
+
+def get_worker_count():
+    """Number of parallel workers from .env (PIPELINE_WORKERS), default one per core"""
+    try:
+        workers = int(os.getenv('PIPELINE_WORKERS', 0))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def load_file_worker(source, file_path, output_folder):
+    """Process-pool task: normalize and load one file on its own connection"""
+    start = time.perf_counter()
+    connection = create_connection()
+    if not connection:
+        raise RuntimeError(f"Failed to connect to database for {file_path}")
+    try:
+        rows = process_file(source, file_path, connection, output_folder)
+    finally:
+        connection.close()
+    if rows is None:
+        raise RuntimeError(f"Loading {Path(file_path).name} failed")
+    return rows, time.perf_counter() - start
+
+
+def run_sources(sources, input_folder=INPUT_FOLDER, output_folder=OUTPUT_FOLDER, workers=None):
+    """Load every file of every source concurrently and wait for all of them.
+
+    Returns {source: {'files', 'rows', 'failed', 'wall_time'}}. Only returns
+    once every submitted file has finished, so the caller can safely start
+    the reconciliation afterwards.
+    """
+    Path(output_folder).mkdir(exist_ok=True)
+    workers = workers or get_worker_count()
+    results = {source: {'files': 0, 'rows': 0, 'failed': 0, 'wall_time': 0.0} for source in sources}
+    started = {}
+    finished = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for source in sources:
+            files = find_source_files(source, input_folder)
+            if not files:
+                print(f"ℹ️ No {source} files found in {input_folder}")
+            started[source] = time.perf_counter()
+            finished[source] = started[source]
+            for file_path in files:
+                future = executor.submit(load_file_worker, source, str(file_path), str(output_folder))
+                futures[future] = (source, file_path)
+
+        # Join barrier: nothing after this loop runs until every file is done
+        for future in as_completed(futures):
+            source, file_path = futures[future]
+            results[source]['files'] += 1
+            finished[source] = time.perf_counter()
+            try:
+                rows, elapsed = future.result()
+                results[source]['rows'] += rows
+                print(f"✅ {source} {file_path.name}: {rows} rows in {elapsed:.2f}s")
+            except Exception as e:
+                results[source]['failed'] += 1
+                print(f"❌ {source} {file_path.name}: {e}")
+
+    for source in sources:
+        results[source]['wall_time'] = finished[source] - started[source]
+    return results
+
+
+def main():
+    """Run the four source pipelines in parallel (or the ones named on the command line)"""
+    sources = sys.argv[1:] or list(SOURCES)
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        print(f"❌ Unknown source(s): {', '.join(unknown)}. Available: {', '.join(SOURCES)}")
+        sys.exit(1)
+
+    connection = create_connection()
+    if not connection:
+        print("❌ Failed to connect to database")
+        sys.exit(1)
+    try:
+        ensure_ledger_tables(connection)
+    finally:
+        connection.close()
+
+    workers = get_worker_count()
+    print(f"🚀 Processing {', '.join(sources)} with {workers} workers...")
+    start = time.perf_counter()
+    results = run_sources(sources, workers=workers)
+
+    print("=" * 50)
+    for source, result in results.items():
+        print(f"{source:<15} files: {result['files']:>4}  rows: {result['rows']:>10}  "
+              f"failed: {result['failed']:>3}  wall time: {result['wall_time']:.2f}s")
+    print(f"Total wall time: {time.perf_counter() - start:.2f}s")
+
+    if any(result['failed'] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import os
+import sys
+from datetime import date
+
+from mysql.connector import Error
+
+from bulk_loader import create_connection
+
+# Transaction and outcome tables are RANGE COLUMNS partitioned by Txn_Date, one
+# partition per month, so a date-filtered query only opens the months it needs.
+# Rows without a date (and anything older than PARTITION_START_MONTH) land in
+# p_history, rows past the last monthly partition in pmax.
+DEFAULT_PARTITION_START = '2024-01'
+DEFAULT_MONTHS_AHEAD = 3
+
+# Compact column types: VARCHAR instead of space-padded CHAR, DECIMAL(14,2) so
+# paise survive, and ENUMs (one byte per row) for the closed value sets.
+# Txn_Type stays a short VARCHAR, the iCloud payment/refund methods are open-ended.
+TXN_SOURCES = ('PayTM', 'PhonePe', 'iCLOUD-PAYMENT', 'iCLOUD-REFUND')
+RECON_STATUSES = ('Perfect', 'Investigate')
+AMOUNT_TYPE = 'DECIMAL(14,2)'
+
+
+def enum_type(values):
+    return "ENUM(" + ",".join(f"'{value}'" for value in values) + ")"
+
+
+TRANSACTION_COLUMNS = [
+    ('Txn_Source', enum_type(TXN_SOURCES)),
+    ('Txn_Machine', 'VARCHAR(10)'),
+    ('Txn_MID', 'VARCHAR(80)'),
+    ('Txn_Type', 'VARCHAR(40)'),
+    ('Txn_Date', 'DATE'),
+    ('Txn_RefNo', 'VARCHAR(60)'),
+    ('Txn_Amount', AMOUNT_TYPE),
+]
+
+TABLES = {
+    'PayTM_PhonePe': {
+        'columns': TRANSACTION_COLUMNS,
+        'indexes': {
+            'idx_txn_refno': 'Txn_RefNo',
+            'idx_src_type_date': 'Txn_Source, Txn_Type, Txn_Date',
+            'idx_machine_date': 'Txn_Machine, Txn_Date',
+        },
+    },
+    'payment_refund': {
+        'columns': TRANSACTION_COLUMNS,
+        'indexes': {
+            'idx_txn_refno': 'Txn_RefNo',
+            'idx_src_type_date': 'Txn_Source, Txn_Type, Txn_Date',
+            'idx_machine_date': 'Txn_Machine, Txn_Date',
+        },
+    },
+    'Recon_Outcome': {
+        'columns': [
+            ('Txn_RefNo', 'VARCHAR(60)'),
+            ('Txn_Machine', 'VARCHAR(10)'),
+            ('Txn_MID', 'VARCHAR(80)'),
+            ('PTPP_Payment', AMOUNT_TYPE),
+            ('PTPP_Refund', AMOUNT_TYPE),
+            ('Cloud_Payment', AMOUNT_TYPE),
+            ('Cloud_Refund', AMOUNT_TYPE),
+            ('Cloud_MRefund', AMOUNT_TYPE),
+            ('delta', AMOUNT_TYPE),
+            ('status', enum_type(RECON_STATUSES)),
+            ('is_manual', 'TINYINT(1) NOT NULL DEFAULT 0'),
+            ('Txn_Date', 'DATE'),
+        ],
+        'indexes': {
+            'idx_txn_refno': 'Txn_RefNo',
+            'idx_recon_class': 'is_manual, status, Txn_RefNo',
+            'idx_machine_date': 'Txn_Machine, Txn_Date',
+        },
+    },
+}
+
+
+def get_partition_settings():
+    """First partitioned month and how many months ahead to pre-create, from .env"""
+    start = os.getenv('PARTITION_START_MONTH', DEFAULT_PARTITION_START)
+    try:
+        first = date(int(start[:4]), int(start[5:7]), 1)
+    except ValueError:
+        print(f"⚠️ Invalid PARTITION_START_MONTH '{start}', using {DEFAULT_PARTITION_START}")
+        first = date(int(DEFAULT_PARTITION_START[:4]), int(DEFAULT_PARTITION_START[5:7]), 1)
+
+    try:
+        months_ahead = int(os.getenv('PARTITION_MONTHS_AHEAD', DEFAULT_MONTHS_AHEAD))
+    except ValueError:
+        months_ahead = DEFAULT_MONTHS_AHEAD
+    return first, max(months_ahead, 0)
+
+
+def add_months(month, count):
+    """First day of the month `count` months after `month`"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """First days of every month from first to last, inclusive"""
+    months = []
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def monthly_partitions(months):
+    """PARTITION definitions for the given months"""
+    return [
+        f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+        for month in months
+    ]
+
+
+def partition_clause(first, last):
+    """Full PARTITION BY clause covering first..last plus history and overflow partitions"""
+    definitions = (
+        [f"PARTITION p_history VALUES LESS THAN ('{first:%Y-%m-%d}')"]
+        + monthly_partitions(month_range(first, last))
+        + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"]
+    )
+    return "PARTITION BY RANGE COLUMNS(Txn_Date) (\n    " + ",\n    ".join(definitions) + "\n)"
+
+
+def _fetch(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def get_partitions(cursor, table):
+    """Names of the table's partitions in order, empty if it is not partitioned"""
+    rows = _fetch(cursor, """
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    return [row[0] for row in rows]
+
+
+def get_indexes(cursor, table):
+    rows = _fetch(cursor, """
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {row[0] for row in rows}
+
+
+def table_exists(cursor, table):
+    rows = _fetch(cursor, """
+        SELECT 1 FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return bool(rows)
+
+
+def get_column_types(cursor, table):
+    """{column: lower-case COLUMN_TYPE} as MySQL reports it"""
+    rows = _fetch(cursor, """
+        SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {name: str(column_type).lower() for name, column_type in rows}
+
+
+def get_table_sizes(cursor):
+    """{table: (data_bytes, index_bytes)} after refreshing the InnoDB statistics"""
+    sizes = {}
+    for table in TABLES:
+        _fetch(cursor, f"ANALYZE TABLE {table}")
+        rows = _fetch(cursor, """
+            SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        if rows:
+            sizes[table] = (int(rows[0][0] or 0), int(rows[0][1] or 0))
+    return sizes
+
+
+def print_table_sizes(before, after):
+    """Print data/index size per table before and after a migration, in MB"""
+    print(f"{'Table':<16}{'Data MB':>18}{'Index MB':>18}")
+    for table, (data_after, index_after) in after.items():
+        data_before, index_before = before.get(table, (0, 0))
+        print(f"{table:<16}{data_before / 1048576:>8.1f} -> {data_after / 1048576:<7.1f}"
+              f"{index_before / 1048576:>8.1f} -> {index_after / 1048576:<7.1f}")
+
+
+def column_exists(cursor, table, column):
+    rows = _fetch(cursor, """
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return bool(rows)
+
+
+def add_missing_date_columns(cursor):
+    """Add Txn_Date to existing tables that lack it, returns the tables changed.
+
+    recon_engine writes Txn_Date into Recon_Outcome, so a table created from an
+    older Create_Tables_n_Indexes.txt would make every recon run fail.
+    """
+    added = []
+    for table in TABLES:
+        if table_exists(cursor, table) and not column_exists(cursor, table, 'Txn_Date'):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN Txn_Date date")
+            print(f"✅ {table}: Txn_Date column added")
+            added.append(table)
+    if 'Recon_Outcome' in added:
+        print("ℹ️ Fill Recon_Outcome.Txn_Date with: python Update_Recon_Outcome.py --full")
+    return added
+
+
+def create_tables(cursor, first, last):
+    """Create any missing table already partitioned and indexed"""
+    for table, spec in TABLES.items():
+        if table_exists(cursor, table):
+            continue
+        columns = ",\n    ".join(f"{name} {column_type}" for name, column_type in spec['columns'])
+        indexes = ''.join(f",\n    INDEX {name} ({columns})" for name, columns in spec['indexes'].items())
+        cursor.execute(f"CREATE TABLE {table} (\n    {columns}{indexes}\n) {partition_clause(first, last)}")
+        print(f"✅ {table} created with partitions up to {last:%Y-%m}")
+
+
+def partition_existing_tables(cursor, first, last):
+    """Add the date column, composite indexes and partitioning to tables created from the old DDL.
+
+    Rebuilds each table once; run it in a maintenance window on large tables.
+    Recon_Outcome gets its Txn_Date filled by the next Update_Recon_Outcome.py --full.
+    """
+    add_missing_date_columns(cursor)
+    for table, spec in TABLES.items():
+        missing = [
+            f"ADD INDEX {name} ({columns})"
+            for name, columns in spec['indexes'].items()
+            if name not in get_indexes(cursor, table)
+        ]
+        if missing:
+            cursor.execute(f"ALTER TABLE {table} {', '.join(missing)}")
+            print(f"✅ {table}: {len(missing)} index(es) added")
+
+        if not get_partitions(cursor, table):
+            cursor.execute(f"ALTER TABLE {table} {partition_clause(first, last)}")
+            print(f"✅ {table} partitioned by month up to {last:%Y-%m}")
+
+
+def migrate_column_types(cursor):
+    """Move existing tables to the compact column types, one ALTER TABLE per table.
+
+    Amounts already stored in the old unscaled numeric columns have lost their
+    paise; reload the input files after migrating to get them back.
+    """
+    for table, spec in TABLES.items():
+        current = get_column_types(cursor, table)
+        changes = [
+            f"MODIFY COLUMN {name} {column_type}"
+            for name, column_type in spec['columns']
+            if name in current and current[name] != column_type.split(' ')[0].lower()
+        ]
+        if not changes:
+            print(f"ℹ️ {table} already uses the compact column types")
+            continue
+
+        if 'Txn_Source' in current:
+            unknown = _fetch(cursor, f"SELECT DISTINCT Txn_Source FROM {table} WHERE Txn_Source NOT IN ({', '.join(['%s'] * len(TXN_SOURCES))})", TXN_SOURCES)
+            if unknown:
+                print(f"❌ {table} has Txn_Source values outside {TXN_SOURCES}: {[row[0] for row in unknown]}, skipped")
+                continue
+
+        cursor.execute(f"ALTER TABLE {table} {', '.join(changes)}")
+        print(f"✅ {table}: {len(changes)} column(s) converted")
+
+
+def extend_partitions(cursor, last):
+    """Split pmax so every table has monthly partitions up to `last`"""
+    for table in TABLES:
+        partitions = get_partitions(cursor, table)
+        monthly = [name for name in partitions if name.startswith('p') and name[1:].isdigit()]
+        if not monthly or 'pmax' not in partitions:
+            print(f"ℹ️ {table} is not partitioned by month, run: python schema_manager.py partition")
+            continue
+
+        newest = date(int(monthly[-1][1:5]), int(monthly[-1][5:7]), 1)
+        months = month_range(add_months(newest, 1), last)
+        if not months:
+            continue
+        definitions = monthly_partitions(months) + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"]
+        cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(definitions)})")
+        print(f"✅ {table}: {len(months)} partition(s) added up to {last:%Y-%m}")
+
+
+def main():
+    """Create, partition or extend the reconciliation tables.
+
+    python schema_manager.py [create|partition|migrate|extend]
+      create    - create missing tables partitioned, then extend (default)
+      partition - convert tables created from Create_Tables_n_Indexes.txt
+      migrate   - convert existing tables to the compact column types
+      extend    - add the upcoming monthly partitions (run monthly)
+    Every command first adds a missing Txn_Date column to existing tables.
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'create'
+    if command not in ('create', 'partition', 'migrate', 'extend'):
+        print(main.__doc__)
+        sys.exit(1)
+
+    first, months_ahead = get_partition_settings()
+    today = date.today()
+    last = add_months(date(today.year, today.month, 1), months_ahead)
+
+    connection = create_connection()
+    if not connection:
+        print("❌ Failed to connect to database")
+        sys.exit(1)
+
+    cursor = connection.cursor()
+    try:
+        add_missing_date_columns(cursor)
+        if command == 'create':
+            create_tables(cursor, first, last)
+        elif command == 'partition':
+            partition_existing_tables(cursor, first, last)
+        elif command == 'migrate':
+            before = get_table_sizes(cursor)
+            migrate_column_types(cursor)
+            print_table_sizes(before, get_table_sizes(cursor))
+        extend_partitions(cursor, last)
+        print("✅ Schema is up to date")
+    except Error as e:
+        print(f"❌ Schema update failed: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
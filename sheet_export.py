@@ -0,0 +1,145 @@
+import csv
+import io
+import zlib
+
+from mysql.connector import FieldType
+
+from row_serializer import decode_bytes, is_bytes_column
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Optional, only needed for the parquet and arrow formats
+    pa = None
+
+# format -> (mimetype, file extension, needs pyarrow)
+EXPORT_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', '.parquet', True),
+    'arrow': ('application/vnd.apache.arrow.file', '.arrow', True),
+    'csv.gz': ('application/gzip', '.csv.gz', False),
+}
+DEFAULT_BATCH_SIZE = 50000
+
+INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG, FieldType.INT24, FieldType.YEAR}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE, FieldType.DECIMAL, FieldType.NEWDECIMAL}
+
+
+def format_available(fmt):
+    """True if the export format can be produced with the installed libraries"""
+    return fmt in EXPORT_FORMATS and (pa is not None or not EXPORT_FORMATS[fmt][2])
+
+
+def arrow_schema(description):
+    """Arrow schema for a cursor.description, amounts become float64 as in the JSON API"""
+    fields = []
+    for column in description:
+        type_code = column[1]
+        if type_code in INTEGER_TYPES:
+            arrow_type = pa.int64()
+        elif type_code in FLOAT_TYPES:
+            arrow_type = pa.float64()
+        elif type_code in (FieldType.DATE, FieldType.NEWDATE):
+            arrow_type = pa.date32()
+        elif type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+            arrow_type = pa.timestamp('us')
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column[0], arrow_type))
+    return pa.schema(fields)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that collects bytes until they are taken"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def _iter_arrow(cursor, fmt, batch_size):
+    schema = arrow_schema(cursor.description)
+    # Arrow takes dates, datetimes and strings as they are
+    converters = [
+        float if column[1] in (FieldType.DECIMAL, FieldType.NEWDECIMAL)
+        else decode_bytes if is_bytes_column(column) else None
+        for column in cursor.description
+    ]
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa_ipc.new_file(sink, schema, options=pa_ipc.IpcWriteOptions(compression='zstd'))
+
+    for rows in _iter_batches(cursor, batch_size):
+        columns = list(zip(*rows))
+        arrays = []
+        for values, convert, field in zip(columns, converters, schema):
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        chunk = sink.take()
+        if chunk:
+            yield chunk
+
+    writer.close()
+    yield sink.take()
+
+
+def _iter_csv_gz(cursor, batch_size):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    # csv writes dates as ISO strings and Decimals exactly, only bytes need decoding
+    converters = [decode_bytes if is_bytes_column(column) else None for column in cursor.description]
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow([column[0] for column in cursor.description])
+
+    for rows in _iter_batches(cursor, batch_size):
+        columns = list(zip(*rows))
+        for index, convert in enumerate(converters):
+            if convert is not None:
+                columns[index] = [None if value is None else convert(value) for value in columns[index]]
+        writer.writerows(zip(*columns))
+        chunk = compressor.compress(text.getvalue().encode('utf-8'))
+        text.seek(0)
+        text.truncate()
+        if chunk:
+            yield chunk
+
+    yield compressor.compress(text.getvalue().encode('utf-8')) + compressor.flush()
+
+
+def export_cursor(cursor, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the rows of an executed cursor as a compressed parquet, arrow or csv.gz file.
+
+    Rows are fetched batch_size at a time and each batch is written out
+    before the next one is read.
+    """
+    if fmt == 'csv.gz':
+        return _iter_csv_gz(cursor, batch_size)
+    return _iter_arrow(cursor, fmt, batch_size)